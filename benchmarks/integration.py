@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+Teste de integrare: search_subtitles și download_subtitle rulate cap-coadă,
+prin clientul HTTP real, contra serverului simulat (mock_api.py). Fiecare
+scenariu pornește cu un profil gol și injectează alte defecte; se măsoară
+latența și se verifică rezultatul (rânduri afișate, subtitrare activată,
+notificări, cereri trimise). Raportul JSON are aceeași formă ca run.py.
+
+    python benchmarks/integration.py [--output integration.json] [--repeat 5] [--only throttle]
+
+Codul de ieșire e 1 dacă vreo verificare eșuează.
+"""
+import argparse, glob, io, json, os, platform, sys, tempfile, time, uuid, zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mock_api import SRT_TEMPLATE, MockConfig, MockSubsApi
+from run import STATE, configure, load_corpus, measure, play, service  # instalează stub-urile Kodi
+from resources.lib.archive import MAGIC_RAR
+
+STATE.settings['api_key'] = 'mock-key'
+
+PLUGIN_URL = 'plugin://service.subtitles.subsro/'
+
+
+def fresh_profile():
+    """Profil gol (cache, quota, circuit breaker, depozit) și player fără subtitrări"""
+    STATE.profile = tempfile.mkdtemp(prefix='subsro-profile-')
+    STATE.window_properties.clear()
+    STATE.subtitle_streams = []
+    STATE.subtitle_stream = -1
+    STATE.reset_listing()
+    service.reset_session()
+    # Limitatorul de rată ar măsura așteptarea locală, nu serverul
+    service.get_quota_tracker().rate = float('inf')
+
+
+def run_search(case):
+    STATE.reset_listing()
+    sys.argv = [PLUGIN_URL, '1', '?action=search']
+    play(case)
+    service.search_subtitles()
+
+
+class Downloads:
+    """Descărcări succesive, fiecare cu alt id (depozitul local nu le servește)"""
+
+    def __init__(self, api, case):
+        self.items = api.search_items(case['field'], str(case['value']), case['language'])
+        self.case = case
+        self.position = 0
+        self.results = []
+
+    def __call__(self):
+        item = self.items[self.position % len(self.items)]
+        self.position += 1
+        play(self.case)
+        self.results.append(service.download_subtitle(item['id'], item['downloadLink']))
+
+    def succeeded(self):
+        return sum(1 for ok in self.results if ok)
+
+
+def search_and_download(api, case, repeat):
+    """Latența căutării (fără cache) și a descărcării; rândurile și descărcările reușite"""
+    configure(cache_results='false')
+    search = measure(lambda: run_search(case), repeat)
+    search['rows'] = len(STATE.directory)
+    downloads = Downloads(api, case)
+    download = measure(downloads, repeat, setup=STATE.reset_listing)
+    download['succeeded'] = downloads.succeeded()
+    configure(cache_results='true')
+    return {'search': search, 'download': download, 'server': dict(api.stats)}
+
+
+def scenario_baseline(api, case, repeat):
+    result = search_and_download(api, case, repeat)
+    result['checks'] = {
+        'rows': result['search']['rows'] > 0,
+        'downloads': result['download']['succeeded'] == repeat,
+        'files': any(name.endswith('.srt') for name in os.listdir(os.path.join(STATE.temp, 'subsro'))),
+    }
+    return result
+
+
+def scenario_latency(api, case, repeat):
+    api.reset(MockConfig(latency=0.15, jitter=0.05))
+    result = search_and_download(api, case, repeat)
+    result['checks'] = {
+        'rows': result['search']['rows'] > 0,
+        'downloads': result['download']['succeeded'] == repeat,
+        'latency_visible': result['search']['min_ms'] >= 100,
+    }
+    return result
+
+
+def scenario_server_errors(api, case, repeat):
+    # 30% HTTP 503 (prima cerere per endpoint sigur): reîncercările trebuie să acopere majoritatea.
+    # Fără /quota din fundal: doar căutările și descărcările consumă defecte.
+    api.reset(MockConfig(error_rate=0.3, error_status=503, fail_first=1, seed=11))
+    configure(retry_failed_downloads='true', retry_attempts='3', check_quota='false')
+    result = search_and_download(api, case, repeat)
+    configure(check_quota='true')
+    result['checks'] = {
+        'rows': result['search']['rows'] > 0,
+        'downloads': result['download']['succeeded'] >= repeat - 1,
+        'retried': api.stats.get('search', {}).get(503, 0) + api.stats.get('download', {}).get(503, 0) > 0,
+    }
+    return result
+
+
+def scenario_throttle(api, case, repeat):
+    # 429 cu Retry-After: 1 (prima cerere per endpoint sigur) -> clientul așteaptă cel puțin o secundă
+    api.reset(MockConfig(throttle_rate=0.4, retry_after=1, fail_first=1, seed=11))
+    configure(retry_failed_downloads='true', retry_attempts='3', check_quota='false')
+    result = search_and_download(api, case, repeat)
+    configure(check_quota='true')
+    throttled = sum(group.get(429, 0) for group in api.stats.values())
+    result['throttled'] = throttled
+    result['checks'] = {
+        'rows': result['search']['rows'] > 0,
+        'downloads': result['download']['succeeded'] >= repeat - 1,
+        'retry_after_respected': throttled == 0 or max(result['search']['p95_ms'],
+                                                       result['download']['p95_ms']) >= 1000,
+    }
+    return result
+
+
+def scenario_quota_exhausted(api, case, repeat):
+    api.reset(MockConfig(quota_total=100, quota_used=100))
+    # Quota necunoscută local: serverul refuză descărcarea cu ErrorResponse 403
+    configure(check_quota='false')
+    result = search_and_download(api, case, repeat)
+    messages = [message for _, message in STATE.notifications]
+
+    # După /quota starea locală știe că e epuizată: cererile nu mai pleacă
+    configure(check_quota='true')
+    service.refresh_quota(STATE.settings['api_key'])
+    sent = api.requests('search') + api.requests('download')
+    run_search(case)
+    blocked = [message for _, message in STATE.notifications]
+    result['notifications'] = messages + blocked
+    result['checks'] = {
+        'rows': result['search']['rows'] > 0,
+        'no_downloads': result['download']['succeeded'] == 0,
+        'error_message': any('Limita' in message for message in messages),
+        'blocked_locally': api.requests('search') + api.requests('download') == sent and any('epuizată' in message for message in blocked),
+    }
+    return result
+
+
+def scenario_large_results(api, case, repeat):
+    api.reset(MockConfig(large_count=2000))
+    configure(cache_results='false')
+    result = {'search': measure(lambda: run_search(case), repeat)}
+    configure(cache_results='true')
+    result['search']['rows'] = len(STATE.directory)
+    result['server'] = dict(api.stats)
+    page_size = service.get_settings().results_page_size
+    result['checks'] = {'first_page_only': result['search']['rows'] == page_size + 1}
+    return result
+
+
+def scenario_outage(api, case, repeat):
+    # Toate cererile eșuează: după pragul circuit breaker-ului nu mai pleacă nimic
+    api.reset(MockConfig(error_rate=1.0, error_status=503))
+    configure(retry_failed_downloads='false', cache_results='false', check_quota='false')
+    for _ in range(service.BREAKER_THRESHOLD):
+        run_search(case)
+    sent = api.requests()
+    result = {'search': measure(lambda: run_search(case), repeat)}
+    configure(retry_failed_downloads='true', cache_results='true', check_quota='true')
+    result['server'] = dict(api.stats)
+    result['checks'] = {
+        'circuit_open': service.get_circuit_breaker().state()[0] == 'open',
+        'no_requests_while_open': api.requests() == sent,
+        'fails_fast': result['search']['p95_ms'] < 500,
+    }
+    return result
+
+
+def real_video(case):
+    """Cazul dat, cu un fișier video real (amprenta = nume + dimensiune)"""
+    video = os.path.join(tempfile.mkdtemp(prefix='subsro-video-'), os.path.basename(case['playing_file']))
+    with open(video, 'wb') as f:
+        f.write(b'\0' * 4096)
+    return dict(case, playing_file=video)
+
+
+def scenario_history(api, case, repeat):
+    # A doua redare a aceluiași fișier nu mai caută nimic
+    case = real_video(case)
+    item = api.search_items(case['field'], str(case['value']), case['language'])[1]
+    play(case)
+    chosen = service.download_subtitle(item['id'], item['downloadLink'], choice=service.selection_choice(item))
+
+    def replay():
+        STATE.window_properties.pop((10000, service.HISTORY_PROPERTY), None)   # redare nouă
+        run_search(case)
+    # /quota se poate reîmprospăta în fundal; contează căutările și descărcările
+    sent = api.requests('search') + api.requests('download')
+    result = {'search': measure(replay, repeat)}
+    result['server'] = dict(api.stats)
+    result['checks'] = {
+        'chosen': chosen,
+        'no_requests': api.requests('search') + api.requests('download') == sent,
+        'no_list': len(STATE.directory) == 0,
+    }
+    return result
+
+
+def scenario_reopen(api, case, repeat):
+    # Alegere manuală din listă, apoi dialogul redeschis în aceeași redare
+    case = real_video(case)
+    run_search(case)
+    listed = len(STATE.directory)
+    item = api.search_items(case['field'], str(case['value']), case['language'])[1]
+    chosen = service.download_subtitle(item['id'], item['downloadLink'], choice=service.selection_choice(item))
+    downloads = api.requests('download')
+    rows = []
+
+    def reopen():
+        run_search(case)
+        rows.append(len(STATE.directory))
+    result = {'search': measure(reopen, repeat)}
+    result['search']['rows'] = rows
+    result['server'] = dict(api.stats)
+    result['checks'] = {
+        'chosen': chosen,
+        'listed': listed > 0,
+        'list_on_reopen': all(count == listed for count in rows),
+        'no_downloads': api.requests('download') == downloads,
+    }
+    return result
+
+
+def srt(label):
+    """O subtitrare SRT validă, cu replicile marcate de 'label'"""
+    return ''.join(SRT_TEMPLATE.format(n=n, s=n * 2, e=n * 2 + 1, sub_id=label) for n in range(1, 6)).encode('utf-8')
+
+
+def zip_archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as z:
+        for name, data in members.items():
+            z.writestr(name, data)
+    return buffer.getvalue()
+
+
+def rar_archive(members):
+    """Arhivă RAR falsă (semnătură + marcaj unic), citită prin VFS-ul fals din kodi_stubs"""
+    data = MAGIC_RAR + b'\0' + uuid.uuid4().bytes
+    STATE.vfs_archives[data] = members
+    return data
+
+
+def activated_text(sub_id):
+    """Textul ultimei subtitrări scrise pentru id (fișierul activat)"""
+    paths = glob.glob(os.path.join(STATE.temp, 'subsro', f"forced.romanian.subsro.{sub_id}.*"))
+    if not paths:
+        return ''
+    with open(max(paths, key=os.path.getmtime), encoding='utf-8') as f:
+        return f.read()
+
+
+def temp_archives():
+    """Arhive RAR/7z rămase în directorul temporar (trebuie șterse după citire)"""
+    temp_dir = os.path.join(STATE.temp, 'subsro')
+    if not os.path.isdir(temp_dir):
+        return []
+    return [name for name in os.listdir(temp_dir) if name.endswith(('.rar', '.7z'))]
+
+
+def scenario_vfs_archives(api, case, repeat):
+    # RAR prin VFS, ZIP în RAR și RAR în ZIP: "Cea mai potrivită" alege episodul redat
+    handling = STATE.settings['multi_episode_handling']
+    configure(multi_episode_handling='2')
+    stem = os.path.splitext(os.path.basename(case['playing_file']))[0]
+    other = 'Alt.Film.2019.720p.HDTV.x264-XYZ.srt'
+    items = api.search_items(case['field'], str(case['value']), case['language'])
+    archives = {
+        'rar': (rar_archive({f"Subs/{stem}.srt": srt('rar'), 'Subs/citeste.txt': b'subs.ro'}),
+                [f"Subs/{stem}.srt"]),
+        'zip_in_rar': (rar_archive({'pack/inner.zip': zip_archive({other: srt('alt'), f"{stem}.srt": srt('zip_in_rar')})}),
+                       [f"pack/inner.zip/{other}", f"pack/inner.zip/{stem}.srt"]),
+        'rar_in_zip': (zip_archive({'inner.rar': rar_archive({other: srt('alt'), f"{stem}.srt": srt('rar_in_zip')})}),
+                       [f"inner.rar/{other}", f"inner.rar/{stem}.srt"]),
+    }
+    play(case)
+    result = {'downloads': {}, 'members': {}}
+    checks = {}
+    for (name, (data, expected)), item in zip(archives.items(), items):
+        api.archives[int(item['id'])] = data
+        start = time.perf_counter()
+        ok = service.download_subtitle(item['id'], item['downloadLink'])
+        result['downloads'][name] = {'ok': ok, 'ms': round((time.perf_counter() - start) * 1000, 3)}
+        members = service.get_stored_members(int(item['id']))
+        result['members'][name] = members
+        checks[name] = ok and members == expected
+        checks[f"{name}_selected"] = f"subtitrarea {name}" in activated_text(item['id'])
+    configure(multi_episode_handling=handling)
+    result['server'] = dict(api.stats)
+    checks['vfs_read'] = any(url.startswith(('archive://', 'rar://')) for url in STATE.vfs_reads)
+    checks['no_temp_archives'] = not temp_archives()
+    result['checks'] = checks
+    return result
+
+
+def scenario_vfs_unavailable(api, case, repeat):
+    # Fără vfs.libarchive / vfs.rar: notificare explicită, arhiva temporară ștearsă
+    item = api.search_items(case['field'], str(case['value']), case['language'])[0]
+    api.archives[int(item['id'])] = rar_archive({'episod.srt': srt('rar')})
+    schemes, STATE.vfs_schemes = STATE.vfs_schemes, set()
+    try:
+        play(case)
+        ok = service.download_subtitle(item['id'], item['downloadLink'])
+    finally:
+        STATE.vfs_schemes = schemes
+    messages = [message for _, message in STATE.notifications]
+    result = {'notifications': messages, 'server': dict(api.stats)}
+    result['checks'] = {
+        'not_activated': not ok,
+        'vfs_message': any('vfs.libarchive' in message for message in messages),
+        'no_temp_archives': not temp_archives(),
+    }
+    return result
+
+
+SCENARIOS = {
+    'baseline': scenario_baseline,
+    'latency': scenario_latency,
+    'server_errors': scenario_server_errors,
+    'throttle': scenario_throttle,
+    'quota_exhausted': scenario_quota_exhausted,
+    'large_results': scenario_large_results,
+    'outage': scenario_outage,
+    'history': scenario_history,
+    'reopen': scenario_reopen,
+    'vfs_archives': scenario_vfs_archives,
+    'vfs_unavailable': scenario_vfs_unavailable,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de integrare contra serverului subs.ro simulat")
+    parser.add_argument('--output', default='integration_results.json')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', action='append', choices=sorted(SCENARIOS))
+    args = parser.parse_args()
+
+    cases = load_corpus()
+    case = next(c for c in cases if c['field'] == 'imdbid' and len(c['response']['items']) >= args.repeat)
+    # Se măsoară lista de rezultate, nu descărcarea automată
+    configure(download_mode='1')
+
+    results = {}
+    failed = []
+    with MockSubsApi(cases) as api:
+        service.API_BASE = api.base_url
+        for name in args.only or SCENARIOS:
+            api.reset(MockConfig())
+            fresh_profile()
+            start = time.perf_counter()
+            result = SCENARIOS[name](api, case, args.repeat)
+            result['elapsed_s'] = round(time.perf_counter() - start, 2)
+            results[name] = result
+            bad = [check for check, ok in result['checks'].items() if not ok]
+            failed += [f"{name}.{check}" for check in bad]
+            print(f"{name}: {'ok' if not bad else 'EȘEC ' + ', '.join(bad)} ({result['elapsed_s']} s)")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'case': case['name'],
+        'results': results,
+        'failed': failed,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Rezultate scrise în {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
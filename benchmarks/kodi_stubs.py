@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+Înlocuitori in-process pentru modulele Kodi (xbmc, xbmcgui, xbmcaddon,
+xbmcplugin, xbmcvfs), suficienți pentru a importa și rula service.py în afara
+Kodi. Setările implicite sunt citite din resources/settings.xml.
+"""
+import io, os, sys, tempfile, time, types, zipfile
+import xml.etree.ElementTree as ET
+from urllib.parse import unquote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class KodiState:
+    """Starea comună a stub-urilor, inspectabilă din benchmark-uri"""
+
+    def __init__(self):
+        self.profile = tempfile.mkdtemp(prefix='subsro-profile-')
+        self.temp = tempfile.mkdtemp(prefix='subsro-temp-')
+        self.settings = load_default_settings()
+        self.log = []
+        self.directory = []
+        self.notifications = []
+        self.window_properties = {}
+        self.playing_file = ''
+        self.video_info = {}
+        self.playlist = []            # dicturi video_info pentru PlayList(PLAYLIST_VIDEO)
+        self.playlist_position = -1
+        self.subtitle_streams = []
+        self.subtitle_stream = -1
+        self.dialog_select = 0
+        self.dialog_yesno = True
+        # VFS fals pentru archive:// și rar://: arhivele ZIP se citesc cu zipfile,
+        # celelalte (RAR/7z) se înregistrează aici: conținut arhivă -> {membru: octeți}
+        self.vfs_archives = {}
+        self.vfs_schemes = {'archive', 'rar'}   # addon-urile VFS "instalate"
+        self.vfs_reads = []                     # URL-urile citite prin File()
+
+    def reset_listing(self):
+        self.directory = []
+        self.notifications = []
+
+
+def load_default_settings():
+    """Valorile implicite din resources/settings.xml, ca șiruri (ca getSetting)"""
+    tree = ET.parse(os.path.join(ROOT, 'resources', 'settings.xml'))
+    return {s.get('id'): s.get('default', '') for s in tree.iter('setting') if s.get('id')}
+
+
+STATE = KodiState()
+
+
+# ---------------------------------------------------------------- xbmc
+def _make_xbmc():
+    xbmc = types.ModuleType('xbmc')
+    xbmc.LOGDEBUG, xbmc.LOGINFO, xbmc.LOGWARNING, xbmc.LOGERROR, xbmc.LOGFATAL = 0, 1, 2, 3, 4
+
+    def log(msg, level=xbmc.LOGDEBUG):
+        STATE.log.append((level, msg))
+
+    class InfoTagVideo:
+        def __init__(self, info):
+            self._info = info
+
+        def getIMDBNumber(self):
+            return self._info.get('imdbnumber', '')
+
+        def getTVShowTitle(self):
+            return self._info.get('tvshowtitle', '')
+
+        def getSeason(self):
+            return self._info.get('season', -1)
+
+        def getEpisode(self):
+            return self._info.get('episode', -1)
+
+        def getTitle(self):
+            return self._info.get('title', '')
+
+        def getDbId(self):
+            return self._info.get('dbid', -1)
+
+        def getUniqueID(self, key):
+            return self._info.get('uniqueids', {}).get(key, '')
+
+    class Player:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def isPlayingVideo(self):
+            return bool(STATE.playing_file)
+
+        def getPlayingFile(self):
+            return STATE.playing_file
+
+        def getVideoInfoTag(self):
+            return InfoTagVideo(STATE.video_info)
+
+        def setSubtitles(self, path):
+            STATE.subtitle_streams.append('Romanian (External)')
+            STATE.subtitle_stream = len(STATE.subtitle_streams) - 1
+
+        def getAvailableSubtitleStreams(self):
+            return list(STATE.subtitle_streams)
+
+        def getSubtitleStream(self):
+            return STATE.subtitle_stream
+
+        def setSubtitleStream(self, index):
+            STATE.subtitle_stream = index
+
+        def showSubtitles(self, visible):
+            pass
+
+    class PlayListItem:
+        def __init__(self, info):
+            self._info = info
+
+        def getVideoInfoTag(self):
+            return InfoTagVideo(self._info)
+
+        def getPath(self):
+            return self._info.get('file', '')
+
+    class PlayList:
+        def __init__(self, playlist_id):
+            self.playlist_id = playlist_id
+
+        def getposition(self):
+            return STATE.playlist_position
+
+        def size(self):
+            return len(STATE.playlist)
+
+        def __getitem__(self, index):
+            return PlayListItem(STATE.playlist[index])
+
+    class Monitor:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def abortRequested(self):
+            return False
+
+        def waitForAbort(self, timeout=0):
+            if timeout:
+                time.sleep(timeout)
+            return False
+
+    xbmc.log = log
+    xbmc.Player = Player
+    xbmc.Monitor = Monitor
+    xbmc.PlayList = PlayList
+    xbmc.PLAYLIST_VIDEO = 1
+    xbmc.InfoTagVideo = InfoTagVideo
+    xbmc.sleep = lambda ms: time.sleep(ms / 1000.0)
+    xbmc.executebuiltin = lambda cmd, wait=False: None
+    xbmc.getInfoLabel = lambda label: ''
+    return xbmc
+
+
+# ---------------------------------------------------------------- xbmcgui
+def _make_xbmcgui():
+    xbmcgui = types.ModuleType('xbmcgui')
+    xbmcgui.NOTIFICATION_INFO = 'info'
+    xbmcgui.NOTIFICATION_WARNING = 'warning'
+    xbmcgui.NOTIFICATION_ERROR = 'error'
+    xbmcgui.INPUT_ALPHANUM = 0
+
+    class Dialog:
+        def notification(self, heading, message, icon=None, time=0, sound=True):
+            STATE.notifications.append((heading, message))
+
+        def ok(self, heading, message):
+            return True
+
+        def yesno(self, heading, message, *args, **kwargs):
+            return STATE.dialog_yesno
+
+        def select(self, heading, options, *args, **kwargs):
+            return STATE.dialog_select if options else -1
+
+        def input(self, heading, defaultt='', type=0, *args, **kwargs):
+            return ''
+
+    class ListItem:
+        __slots__ = ('label', 'label2', 'art', 'info', 'properties')
+
+        def __init__(self, label='', label2='', path='', offscreen=False):
+            self.label = label
+            self.label2 = label2
+            self.art = {}
+            self.info = {}
+            self.properties = {}
+
+        def setArt(self, art):
+            self.art.update(art)
+
+        def setInfo(self, kind, info):
+            self.info[kind] = info
+
+        def setProperty(self, key, value):
+            self.properties[key] = value
+
+        def getLabel(self):
+            return self.label
+
+    class Window:
+        def __init__(self, window_id=10000):
+            self.window_id = window_id
+
+        def getProperty(self, key):
+            return STATE.window_properties.get((self.window_id, key), '')
+
+        def setProperty(self, key, value):
+            STATE.window_properties[(self.window_id, key)] = value
+
+        def clearProperty(self, key):
+            STATE.window_properties.pop((self.window_id, key), None)
+
+    xbmcgui.Dialog = Dialog
+    xbmcgui.ListItem = ListItem
+    xbmcgui.Window = Window
+    return xbmcgui
+
+
+# ---------------------------------------------------------------- xbmcaddon
+def _make_xbmcaddon():
+    xbmcaddon = types.ModuleType('xbmcaddon')
+
+    class Addon:
+        def __init__(self, addon_id=None):
+            pass
+
+        def getSetting(self, key):
+            return STATE.settings.get(key, '')
+
+        def setSetting(self, key, value):
+            STATE.settings[key] = value
+
+        def getAddonInfo(self, key):
+            return {
+                'id': 'service.subtitles.subsro',
+                'name': 'Subs.ro',
+                'path': ROOT,
+                'profile': 'special://profile/addon_data/service.subtitles.subsro/',
+                'version': '2.0.0',
+            }.get(key, '')
+
+    xbmcaddon.Addon = Addon
+    return xbmcaddon
+
+
+# ---------------------------------------------------------------- xbmcplugin
+def _make_xbmcplugin():
+    xbmcplugin = types.ModuleType('xbmcplugin')
+
+    def addDirectoryItem(handle, url, listitem, isFolder=False, totalItems=0):
+        STATE.directory.append((url, listitem))
+        return True
+
+    def endOfDirectory(handle, succeeded=True, updateListing=False, cacheToDisc=True):
+        pass
+
+    xbmcplugin.addDirectoryItem = addDirectoryItem
+    xbmcplugin.endOfDirectory = endOfDirectory
+    return xbmcplugin
+
+
+# ---------------------------------------------------------------- xbmcvfs
+def _make_xbmcvfs():
+    xbmcvfs = types.ModuleType('xbmcvfs')
+
+    def translatePath(path):
+        if path.startswith('special://profile/addon_data/service.subtitles.subsro'):
+            rest = path[len('special://profile/addon_data/service.subtitles.subsro'):].lstrip('/')
+            return os.path.join(STATE.profile, rest)
+        if path.startswith('special://temp'):
+            return os.path.join(STATE.temp, path[len('special://temp'):].lstrip('/'))
+        return path
+
+    class Stat:
+        def __init__(self, path):
+            self._stat = os.stat(path)
+
+        def st_size(self):
+            return self._stat.st_size
+
+        def st_mtime(self):
+            return int(self._stat.st_mtime)
+
+    def split_archive_url(url):
+        """archive://<cale codificată>/<membru> -> (cale, membru); None pentru alte URL-uri"""
+        scheme, sep, rest = url.partition('://')
+        if not sep or scheme not in ('archive', 'rar'):
+            return None
+        if scheme not in STATE.vfs_schemes:
+            raise OSError(f"schemă VFS indisponibilă: {scheme}")
+        quoted, _, member = rest.partition('/')
+        return unquote(quoted), member
+
+    def archive_members(path):
+        data = read_url(path)
+        if data in STATE.vfs_archives:
+            return STATE.vfs_archives[data]
+        if zipfile.is_zipfile(io.BytesIO(data)):
+            with zipfile.ZipFile(io.BytesIO(data)) as z:
+                return {n: z.read(n) for n in z.namelist() if not n.endswith('/')}
+        raise OSError(f"arhivă nerecunoscută: {path}")
+
+    def read_url(url):
+        parts = split_archive_url(url)
+        if parts is None:
+            with open(translatePath(url), 'rb') as f:
+                return f.read()
+        return archive_members(parts[0])[parts[1]]
+
+    def listdir(url):
+        # Ca în Kodi: o cale de nelistat întoarce liste goale, nu o excepție
+        try:
+            parts = split_archive_url(url)
+            if parts is None:
+                path = translatePath(url)
+                names = os.listdir(path)
+                return ([n for n in names if os.path.isdir(os.path.join(path, n))],
+                        [n for n in names if not os.path.isdir(os.path.join(path, n))])
+            members = archive_members(parts[0])
+        except (OSError, KeyError):
+            return [], []
+        prefix = parts[1]
+        dirs, files = set(), []
+        for name in members:
+            if name.startswith(prefix):
+                rest = name[len(prefix):]
+                if '/' in rest:
+                    dirs.add(rest.split('/', 1)[0])
+                elif rest:
+                    files.append(rest)
+        return sorted(dirs), sorted(files)
+
+    class File:
+        def __init__(self, url, mode=None):
+            self._url = url
+
+        def readBytes(self, numBytes=0):
+            STATE.vfs_reads.append(self._url)
+            data = read_url(self._url)
+            return bytearray(data[:numBytes] if numBytes else data)
+
+        def close(self):
+            pass
+
+    xbmcvfs.translatePath = translatePath
+    xbmcvfs.exists = os.path.exists
+    xbmcvfs.Stat = Stat
+    xbmcvfs.listdir = listdir
+    xbmcvfs.File = File
+    return xbmcvfs
+
+
+def install():
+    """Înregistrează modulele false în sys.modules și face importabil service.py"""
+    for name, factory in (('xbmc', _make_xbmc), ('xbmcgui', _make_xbmcgui),
+                          ('xbmcaddon', _make_xbmcaddon), ('xbmcplugin', _make_xbmcplugin),
+                          ('xbmcvfs', _make_xbmcvfs)):
+        sys.modules[name] = factory()
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return STATE
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Server local care imită API-ul subs.ro v1.0 pentru testele de integrare:
+
+    GET /v1.0/quota                               -> QuotaInfo
+    GET /v1.0/search/{field}/{value}?language=xx  -> SubtitleItem[]
+    GET /v1.0/subtitle/{id}/download              -> arhivă ZIP (application/octet-stream)
+
+Pentru alte formate (RAR, arhive imbricate) se înregistrează conținutul
+răspunsului per id în 'archives'.
+
+Erorile au forma ErrorResponse ({status, message, meta: {requestId}}).
+Autentificarea acceptă header-ul X-Subs-Api-Key sau parametrul apiKey.
+Defectele se injectează prin MockConfig: latență, rată de erori 5xx, 429 cu
+Retry-After, quota epuizată și liste mari de rezultate. Fiecare endpoint are
+propriul aleator cu seed fix: secvența de defecte a unui endpoint nu depinde de
+cererile trimise în paralel pe celelalte (ex. /quota din fundal).
+
+    python benchmarks/mock_api.py --port 8765 --latency 0.2 --error-rate 0.1
+"""
+import argparse, io, json, os, random, sys, threading, time, uuid, zipfile, zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+API_PREFIX = '/v1.0'
+SEARCH_FIELDS = ('imdbid', 'tmdbid', 'title', 'release')
+
+SRT_TEMPLATE = "{n}\n00:00:{s:02d},000 --> 00:00:{e:02d},500\nReplica {n} pentru subtitrarea {sub_id}\n\n"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clientul închide conexiunea când renunță la un răspuns (reîncercare, timeout)
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockConfig:
+    """Comportamentul serverului; poate fi modificat între scenarii"""
+
+    def __init__(self, api_key='mock-key', latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 throttle_rate=0.0, retry_after=1, quota_total=1000, quota_used=0, quota_type='daily',
+                 large_count=0, fail_first=0, seed=1):
+        self.api_key = api_key
+        self.latency = latency            # secunde adăugate fiecărui răspuns
+        self.jitter = jitter              # +/- secunde aleatoare peste latență
+        self.error_rate = error_rate      # proporția răspunsurilor 'error_status'
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate  # proporția răspunsurilor 429
+        self.retry_after = retry_after    # valoarea header-ului Retry-After (secunde)
+        self.quota_total = quota_total
+        self.quota_used = quota_used
+        self.quota_type = quota_type
+        self.large_count = large_count    # >0: fiecare căutare întoarce atâtea rezultate
+        self.fail_first = fail_first      # primele cereri per endpoint primesc sigur defectul
+        self.seed = seed
+
+
+class MockSubsApi:
+    """
+    Serverul HTTP (fir separat, port liber ales automat). Rezultatele căutării
+    vin din cazurile corpus-ului (field, value, language); restul întoarce o listă goală.
+    """
+
+    def __init__(self, cases=(), config=None, host='127.0.0.1', port=0):
+        self.config = config or MockConfig()
+        self.responses = {}
+        for case in cases:
+            key = (case['field'], str(case['value']), case.get('language', 'ro'))
+            self.responses[key] = case['response']['items']
+        self.lock = threading.Lock()
+        self.randoms = {}
+        self.seen = {}
+        self.stats = {}
+        self.archives = {}            # id -> octeții răspunsului /download (altfel ZIP generat)
+        self.server = _Server((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='subsro-mock-api', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self, config=None):
+        """Configurație nouă și statistici golite (între scenarii)"""
+        with self.lock:
+            if config is not None:
+                self.config = config
+            self.randoms = {}
+            self.seen = {}
+            self.stats = {}
+            self.archives = {}
+
+    def count(self, endpoint, status):
+        with self.lock:
+            per_endpoint = self.stats.setdefault(endpoint, {})
+            per_endpoint[status] = per_endpoint.get(status, 0) + 1
+
+    def requests(self, endpoint=None):
+        """Numărul de cereri primite (pe un endpoint sau total)"""
+        with self.lock:
+            groups = [self.stats.get(endpoint, {})] if endpoint else list(self.stats.values())
+            return sum(sum(group.values()) for group in groups)
+
+    # ------------------------------------------------------------ răspunsuri
+    def quota_info(self):
+        cfg = self.config
+        return {
+            'total_quota': cfg.quota_total,
+            'used_quota': min(cfg.quota_used, cfg.quota_total),
+            'remaining_quota': max(0, cfg.quota_total - cfg.quota_used),
+            'quota_type': cfg.quota_type,
+        }
+
+    def search_items(self, field, value, language):
+        cfg = self.config
+        items = self.responses.get((field, value, language), [])
+        if cfg.large_count and items:
+            items = [dict(items[i % len(items)], id=20_000_000 + i,
+                          title=f"{items[i % len(items)]['title']}.r{i}")
+                     for i in range(cfg.large_count)]
+        base = self.base_url
+        return [dict(item, downloadLink=f"{base}/subtitle/{item['id']}/download") for item in items]
+
+    def subtitle_archive(self, sub_id):
+        """Conținutul înregistrat pentru id sau o arhivă ZIP cu o subtitrare SRT validă"""
+        if sub_id in self.archives:
+            return self.archives[sub_id]
+        text = ''.join(SRT_TEMPLATE.format(n=n, s=n * 2, e=n * 2 + 1, sub_id=sub_id) for n in range(1, 25))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.writestr(f"subsro.{sub_id}.srt", text.encode('utf-8'))
+        return buffer.getvalue()
+
+    def fault(self, endpoint):
+        """Defectul injectat pentru cererea curentă: None, 'throttle' sau 'error'"""
+        cfg = self.config
+        with self.lock:
+            rng = self.randoms.get(endpoint)
+            if rng is None:
+                # crc32, nu hash(): hash-ul șirurilor diferă între procese
+                rng = self.randoms[endpoint] = random.Random(cfg.seed ^ zlib.crc32(endpoint.encode()))
+            roll = rng.random()
+            seen = self.seen[endpoint] = self.seen.get(endpoint, 0) + 1
+            delay = cfg.latency + (rng.uniform(-cfg.jitter, cfg.jitter) if cfg.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if seen <= cfg.fail_first:
+            return 'throttle' if cfg.throttle_rate else 'error'
+        if roll < cfg.throttle_rate:
+            return 'throttle'
+        if roll < cfg.throttle_rate + cfg.error_rate:
+            return 'error'
+        return None
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'     # keep-alive, ca serverul real
+
+            def log_message(self, fmt, *args):
+                pass
+
+            def send_json(self, status, body, endpoint, headers=None):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+                api.count(endpoint, status)
+
+            def send_error_response(self, status, message, endpoint, headers=None):
+                self.send_json(status, {'status': status, 'message': message,
+                                        'meta': {'requestId': uuid.uuid4().hex}}, endpoint, headers)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                path = parts.path[len(API_PREFIX):] if parts.path.startswith(API_PREFIX) else None
+                segments = [unquote(s) for s in path.strip('/').split('/')] if path else []
+                endpoint = segments[0] if segments else 'unknown'
+                if endpoint == 'subtitle':
+                    endpoint = 'download'
+
+                key = self.headers.get('X-Subs-Api-Key') or query.get('apiKey', [''])[0]
+                if key != api.config.api_key:
+                    return self.send_error_response(401, "Cheie API invalidă", endpoint)
+
+                fault = api.fault(endpoint)
+                if fault == 'throttle':
+                    return self.send_error_response(429, "Prea multe cereri", endpoint,
+                                                    {'Retry-After': str(api.config.retry_after)})
+                if fault == 'error':
+                    return self.send_error_response(api.config.error_status, "Eroare simulată", endpoint)
+
+                if segments == ['quota']:
+                    return self.send_json(200, {'status': 200, 'meta': {'requestId': uuid.uuid4().hex},
+                                                'quota': api.quota_info()}, endpoint)
+
+                if len(segments) == 3 and endpoint == 'search' and segments[1] in SEARCH_FIELDS:
+                    language = query.get('language', ['ro'])[0]
+                    items = api.search_items(segments[1], segments[2], language)
+                    return self.send_json(200, {'status': 200, 'meta': {'requestId': uuid.uuid4().hex},
+                                                'count': len(items), 'items': items}, endpoint)
+
+                if len(segments) == 3 and segments[2] == 'download' and segments[1].isdigit():
+                    with api.lock:
+                        exhausted = api.config.quota_used >= api.config.quota_total
+                        if not exhausted:
+                            api.config.quota_used += 1
+                    if exhausted:
+                        return self.send_error_response(403, "Limita de descărcări a fost atinsă", endpoint)
+                    data = api.subtitle_archive(int(segments[1]))
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/octet-stream')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    api.count(endpoint, 200)
+                    return
+
+                return self.send_error_response(404, "Resursă inexistentă", endpoint)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server subs.ro simulat")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--api-key', default='mock-key')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--quota', type=int, default=1000)
+    parser.add_argument('--large', type=int, default=0, help="rezultate per căutare (0 = ca în corpus)")
+    args = parser.parse_args()
+
+    corpus = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus.json')
+    with open(corpus, 'r', encoding='utf-8') as f:
+        cases = json.load(f)['cases']
+    config = MockConfig(api_key=args.api_key, latency=args.latency, error_rate=args.error_rate,
+                        throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                        quota_total=args.quota, large_count=args.large)
+    api = MockSubsApi(cases, config, port=args.port)
+    print(f"Server subs.ro simulat pe {api.base_url}")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
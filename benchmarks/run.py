@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark offline pentru service.py.
+
+Rulează în afara Kodi cu modulele xbmc* înlocuite (kodi_stubs) și cu răspunsuri
+/search înregistrate (corpus.json). Rezultatele se scriu într-un fișier JSON:
+
+    python benchmarks/run.py [--output bench_results.json] [--repeat 20] [--only sort_subtitles_by_match]
+"""
+import argparse, json, os, platform, statistics, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import kodi_stubs
+
+STATE = kodi_stubs.install()
+STATE.settings['api_key'] = 'benchmark-key'
+STATE.settings['api_key_validated'] = 'true'
+
+import service  # noqa: E402  (după instalarea stub-urilor)
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus.json')
+
+
+class RecordedResponse:
+    """Răspuns HTTP minimal, compatibil cu ce folosește service.py"""
+
+    def __init__(self, status_code=200, payload=None, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content if payload is None else json.dumps(payload).encode('utf-8')
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=65536):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class RecordedClient:
+    """Înlocuiește ApiClient: servește răspunsurile din corpus, fără rețea"""
+
+    def __init__(self, cases):
+        self.responses = {}
+        for case in cases:
+            self.responses[(case['field'], str(case['value']))] = case['response']
+        self.requests = 0
+
+    def get(self, endpoint, url, params=None, headers=None, stream=False):
+        self.requests += 1
+        if endpoint == 'quota':
+            return RecordedResponse(payload={'status': 200, 'quota': {
+                'total_quota': 1000, 'used_quota': 10, 'remaining_quota': 990, 'quota_type': 'daily'}})
+        if endpoint == 'search':
+            field, value = url.rsplit('/search/', 1)[1].split('/', 1)
+            payload = self.responses.get((field, service.urllib.parse.unquote(value)))
+            if payload is None:
+                return RecordedResponse(payload={'status': 200, 'count': 0, 'items': []})
+            return RecordedResponse(payload=payload)
+        return RecordedResponse(status_code=404, payload={'status': 404, 'message': 'Not found'})
+
+
+def configure(**settings):
+    """Modifică setările false și reîncarcă instantaneul din service.py"""
+    STATE.settings.update(settings)
+    service.load_settings()
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['cases']
+
+
+def measure(func, repeat, setup=None):
+    """Rulează func de 'repeat' ori; returnează statistici în milisecunde"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return {
+        'runs': repeat,
+        'mean_ms': statistics.fmean(samples),
+        'median_ms': statistics.median(samples),
+        'min_ms': samples[0],
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def play(case):
+    """Configurează player-ul fals pentru cazul dat"""
+    STATE.playing_file = case['playing_file']
+    STATE.video_info = case['video_info']
+
+
+def fresh_items(case):
+    return [dict(item) for item in case['response']['items']]
+
+
+def bench_calculate_match_score(cases, repeat):
+    pairs = [(item['title'], case['playing_file']) for case in cases for item in case['response']['items']]
+
+    def run():
+        for title, video_file in pairs:
+            service.calculate_match_score(title, video_file)
+    result = measure(run, repeat)
+    result['calls'] = len(pairs)
+    return result
+
+
+def bench_sort_subtitles_by_match(cases, repeat):
+    results = {}
+    for case in cases:
+        results[case['name']] = measure(
+            lambda: service.sort_subtitles_by_match(fresh_items(case), case['playing_file']), repeat)
+        results[case['name']]['items'] = len(case['response']['items'])
+    return results
+
+
+def bench_filter_subtitles(cases, repeat):
+    configure(filter_by_hearing_impaired='true')
+    try:
+        items = [item for case in cases for item in case['response']['items']]
+        result = measure(lambda: service.filter_subtitles(items, {}), repeat)
+        result['items'] = len(items)
+        return result
+    finally:
+        configure(filter_by_hearing_impaired='false')
+
+
+def clear_parse_caches():
+    """Golește memoria parserului de release și a similarității (proces nou)"""
+    from resources.lib import release, similarity
+    release._PRELOADED.clear()
+    release._parse.cache_clear()
+    similarity.features.cache_clear()
+
+
+def bench_cache(cases, repeat):
+    def save_all():
+        for case in cases:
+            service.save_to_cache(case['field'], case['value'], case['language'], case['response'])
+
+    def load_all():
+        for case in cases:
+            assert service.load_from_cache(case['field'], case['value'], case['language']) is not None
+
+    def load_and_rank():
+        for case in cases:
+            data = service.load_from_cache(case['field'], case['value'], case['language'])
+            service.sort_subtitles_by_match(data['items'], case['playing_file'])
+
+    save = measure(save_all, repeat)
+    load = measure(load_all, repeat)
+    # Ca într-o invocare nouă a addon-ului: fără titluri parsate deja în memorie
+    hit = measure(load_and_rank, repeat, setup=clear_parse_caches)
+    entries, size = service.get_search_cache().stats()
+    return {'save': save, 'load': load, 'load_and_rank': hit, 'entries': entries, 'bytes': size}
+
+
+def bench_search_subtitles(cases, repeat):
+    recorded = RecordedClient(cases)
+    service._API_CLIENT = (STATE.settings['api_key'], recorded)
+    # Limitatorul de rată ar măsura așteptarea, nu codul
+    service.get_quota_tracker().rate = float('inf')
+    sys.argv = ['plugin://service.subtitles.subsro/', '1', '?action=search']
+    # Se măsoară construirea listei, nu descărcarea automată
+    configure(download_mode='1')
+    results = {}
+    for mode, cache_enabled in (('cold', 'false'), ('warm', 'true')):
+        configure(cache_results=cache_enabled)
+        per_case = {}
+        for case in cases:
+            play(case)
+            if cache_enabled == 'true':
+                service.search_subtitles()  # încălzește cache-ul
+            per_case[case['name']] = measure(service.search_subtitles, repeat, setup=STATE.reset_listing)
+            per_case[case['name']]['rows'] = len(STATE.directory)
+        results[mode] = per_case
+    configure(cache_results='true')
+    return results
+
+
+def synthetic_items(cases, count):
+    """'count' rezultate construite din corpus (id-uri și titluri variate)"""
+    pool = [item for case in cases for item in case['response']['items']]
+    items = []
+    for i in range(count):
+        item = dict(pool[i % len(pool)])
+        item['id'] = 10_000_000 + i
+        item['title'] = f"{item['title']}.v{i // len(pool)}" if i >= len(pool) else item['title']
+        items.append(item)
+    return items
+
+
+def bench_large_results(cases, repeat):
+    """Sortare completă vs. top-K (o pagină) pe liste mari, cu vârful de memorie"""
+    import tracemalloc
+    case = cases[0]
+    page = service.get_settings().results_page_size
+    results = {}
+    for count in (100, 1000, 5000):
+        template = synthetic_items(cases, count)
+        per_size = {}
+        for mode, limit in (('full', None), ('top_k', page)):
+            run = lambda: service.sort_subtitles_by_match([dict(i) for i in template], case['playing_file'], limit)
+            per_size[mode] = measure(run, repeat)
+            tracemalloc.start()
+            run()
+            per_size[mode]['peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024.0, 1)
+            tracemalloc.stop()
+        results[str(count)] = per_size
+    return results
+
+
+def ranking_quality(cases):
+    """Poziția (1 = prima) a subtitrării de referință în clasament, per caz"""
+    positions = {}
+    for case in cases:
+        ranked = service.sort_subtitles_by_match(fresh_items(case), case['playing_file'])
+        ids = [item['id'] for item in ranked]
+        positions[case['name']] = ids.index(case['expected_id']) + 1 if case['expected_id'] in ids else None
+    found = [p for p in positions.values() if p is not None]
+    return {
+        'positions': positions,
+        'top1': sum(1 for p in found if p == 1) / float(len(cases)),
+        'mean_position': statistics.fmean(found) if found else None,
+    }
+
+
+BENCHMARKS = {
+    'calculate_match_score': bench_calculate_match_score,
+    'sort_subtitles_by_match': bench_sort_subtitles_by_match,
+    'filter_subtitles': bench_filter_subtitles,
+    'cache': bench_cache,
+    'search_subtitles': bench_search_subtitles,
+    'large_results': bench_large_results,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default='bench_results.json', help='fișierul JSON cu rezultate')
+    parser.add_argument('--repeat', type=int, default=20, help='repetări per măsurătoare')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help='rulează doar benchmark-ul dat')
+    args = parser.parse_args(argv)
+
+    cases = load_corpus()
+    configure(debug_log='false')
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpus': {'cases': len(cases), 'items': sum(len(c['response']['items']) for c in cases)},
+        'ranking': ranking_quality(cases),
+        'benchmarks': {},
+    }
+    for name in args.only or BENCHMARKS:
+        report['benchmarks'][name] = BENCHMARKS[name](cases, args.repeat)
+        print(f"{name}: ok")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Rezultate scrise în {args.output} (top-1: {report['ranking']['top1']:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Serviciu de fundal (xbmc.service): la pornirea redării preîncarcă în cache
+rezultatele căutării pentru elementul curent și pentru următorul din playlist
+(episoadele următoare sunt acoperite de căutarea la nivel de sezon), astfel
+încât dialogul de subtitrări se deschide fără așteptare la rețea.
+"""
+import xbmc, xbmcgui
+import os, threading
+
+import service
+
+
+def next_playlist_item():
+    """(InfoTagVideo, cale) pentru următorul element din playlist-ul video, dacă există"""
+    try:
+        playlist = xbmc.PlayList(xbmc.PLAYLIST_VIDEO)
+        position = playlist.getposition()
+        if position < 0 or position + 1 >= playlist.size():
+            return None
+        item = playlist[position + 1]
+        return item.getVideoInfoTag(), item.getPath()
+    except Exception as e:
+        service.log(f"Preîncărcare: playlist indisponibil: {e}", xbmc.LOGDEBUG)
+        return None
+
+
+class PrefetchPlayer(xbmc.Player):
+    """Pornește preîncărcarea pe un fir separat la fiecare redare nouă"""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+    def onAVStarted(self):
+        # Redare nouă: istoricul și modul automat pot activa din nou o subtitrare
+        home = xbmcgui.Window(10000)
+        home.clearProperty(service.HISTORY_PROPERTY)
+        home.clearProperty(service.ACTIVATED_PROPERTY)
+        cfg = service.get_settings()
+        if not cfg.prefetch_on_playback or not cfg.cache_results:
+            return
+        if not self.isPlayingVideo():
+            return
+        info = self.getVideoInfoTag()
+        target = (info, self.getPlayingFile(), xbmc.getInfoLabel('VideoPlayer.Title'))
+        threading.Thread(target=self.prefetch, args=(target,), name='subsro-prefetch', daemon=True).start()
+
+    def prefetch(self, current):
+        # O singură preîncărcare odată: obiectele din service.py sunt comune
+        if not self.lock.acquire(blocking=False):
+            service.log("Preîncărcare deja în curs", xbmc.LOGDEBUG)
+            return
+        service.start_telemetry('prefetch')
+        try:
+            api_key = service.get_settings().api_key
+            if not api_key:
+                return
+            languages = service.get_search_languages()
+
+            # Episoadele următoare din același sezon sunt acoperite de căutarea
+            # la nivel de sezon (indexul pe sezoane); playlist-ul poate avea altceva
+            targets = [current]
+            if service.get_settings().prefetch_next:
+                next_item = next_playlist_item()
+                if next_item is not None:
+                    targets.append((next_item[0], next_item[1], ''))
+
+            for info, video_file, fallback_title in targets:
+                if xbmc.Monitor().abortRequested():
+                    break
+                context = service.get_episode_context(info, languages)
+                if context is not None and service.load_from_season_index(context) is not None:
+                    continue
+                field, data = service.search_with_plan(api_key, info, video_file, fallback_title,
+                                                       languages, interactive=False)
+                if context is not None and data and data.get('status') == 200 and not data.get('stale'):
+                    service.index_season_results(context, data)
+                service.log(f"Preîncărcare {os.path.basename(video_file)}: {field or 'fără rezultate'}")
+        except Exception as e:
+            service.log(f"Eroare preîncărcare: {e}", xbmc.LOGERROR)
+        finally:
+            service.finish_telemetry()
+            self.lock.release()
+
+
+class PrefetchMonitor(xbmc.Monitor):
+    """Recitește setările când utilizatorul le modifică"""
+
+    def __init__(self, player):
+        super().__init__()
+        self.player = player
+
+    def onSettingsChanged(self):
+        with self.player.lock:
+            service.reset_session()
+
+
+if __name__ == '__main__':
+    player = PrefetchPlayer()
+    monitor = PrefetchMonitor(player)
+    service.log("Serviciu de preîncărcare pornit")
+    while not monitor.abortRequested():
+        if monitor.waitForAbort(10):
+            break
+    service.log("Serviciu de preîncărcare oprit")
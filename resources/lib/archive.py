@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+Citirea în memorie a subtitrărilor descărcate.
+Răspunsul e citit pe bucăți într-un buffer limitat (SpooledTemporaryFile), iar
+formatul se detectează după primii octeți: arhivă ZIP, gzip, text simplu
+(SRT/ASS), RAR sau 7z. ZIP se citește în memorie; RAR și 7z se citesc prin
+VFS-ul Kodi (archive:// de la vfs.libarchive sau rar:// de la vfs.rar), fără
+extragerea membrilor pe disc. Arhivele din arhive sunt deschise recursiv.
+Nimic nu trece prin fișiere temporare cu nume fix.
+"""
+import gzip, io, os, shutil, tempfile, uuid
+from urllib.parse import quote
+
+SUBTITLE_EXTENSIONS = ('.srt', '.ass')
+ARCHIVE_EXTENSIONS = ('.zip', '.rar', '.7z')
+MAX_NESTING = 2                       # arhivă în arhivă în arhivă
+
+# Schemele VFS încercate per format, în ordine
+VFS_SCHEMES = {'rar': ('archive', 'rar'), '7z': ('archive',)}
+
+MAX_PAYLOAD_SIZE = 20 * 1024 * 1024   # limită pentru un răspuns /download
+SPOOL_SIZE = 2 * 1024 * 1024          # peste această dimensiune bufferul trece pe disc
+CHUNK_SIZE = 64 * 1024
+
+MAGIC_ZIP  = b'PK\x03\x04'
+MAGIC_GZIP = b'\x1f\x8b'
+MAGIC_RAR  = b'Rar!\x1a\x07'
+MAGIC_7Z   = b'7z\xbc\xaf\x27\x1c'
+
+
+class PayloadTooLarge(Exception):
+    """Răspunsul depășește MAX_PAYLOAD_SIZE"""
+
+
+class UnsupportedPayload(Exception):
+    """Format necunoscut sau nesuportat"""
+
+
+class VfsUnavailable(UnsupportedPayload):
+    """Arhivă RAR/7z pe care VFS-ul Kodi nu o poate deschide (lipsește vfs.libarchive / vfs.rar)"""
+
+
+def read_stream(chunks, max_size=MAX_PAYLOAD_SIZE, spool_size=SPOOL_SIZE):
+    """
+    Copiază bucățile unui răspuns într-un buffer limitat și îl returnează
+    poziționat la început. Ridică PayloadTooLarge peste 'max_size'.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    total = 0
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            total += len(chunk)
+            if total > max_size:
+                raise PayloadTooLarge(f"{total} > {max_size} octeți")
+            buffer.write(chunk)
+    except BaseException:
+        buffer.close()
+        raise
+    buffer.seek(0)
+    return buffer
+
+
+def detect_format(head):
+    """Identifică formatul după primii octeți: zip | gzip | rar | 7z | text | None"""
+    if head.startswith(MAGIC_ZIP):
+        return 'zip'
+    if head.startswith(MAGIC_GZIP):
+        return 'gzip'
+    if head.startswith(MAGIC_RAR):
+        return 'rar'
+    if head.startswith(MAGIC_7Z):
+        return '7z'
+    if looks_like_subtitle(head):
+        return 'text'
+    return None
+
+
+def looks_like_subtitle(head):
+    """Text SRT/ASS: BOM, '[Script Info]' sau un prim bloc SRT numerotat"""
+    if head.startswith((b'\xef\xbb\xbf', b'\xff\xfe', b'\xfe\xff')):
+        return True
+    stripped = head.lstrip()
+    if stripped.startswith(b'[Script Info]'):
+        return True
+    first_line = stripped.split(b'\n', 1)[0].strip()
+    return first_line.isdigit() and b'-->' in stripped[:256]
+
+
+def subtitle_extension(head):
+    """Extensia potrivită pentru un text de subtitrare"""
+    return '.ass' if b'[Script Info]' in head[:512] else '.srt'
+
+
+def is_subtitle(name):
+    return name.lower().endswith(SUBTITLE_EXTENSIONS)
+
+
+def is_archive(name):
+    return name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+class ZipPayload:
+    """Arhivă ZIP deschisă direct din buffer"""
+
+    def __init__(self, fileobj):
+        import zipfile
+        self.zip = zipfile.ZipFile(fileobj, 'r')
+
+    def names(self):
+        return sorted(n for n in self.zip.namelist() if not n.endswith('/'))
+
+    def members(self):
+        return [n for n in self.names() if is_subtitle(n)]
+
+    def read(self, name):
+        # Dimensiunea din antet poate minți (zip bomb): citirea e și ea limitată
+        info = self.zip.getinfo(name)
+        if info.file_size > MAX_PAYLOAD_SIZE:
+            raise PayloadTooLarge(f"{name}: {info.file_size} > {MAX_PAYLOAD_SIZE} octeți")
+        with self.zip.open(info) as f:
+            data = f.read(MAX_PAYLOAD_SIZE + 1)
+        if len(data) > MAX_PAYLOAD_SIZE:
+            raise PayloadTooLarge(f"{name}: decomprimat > {MAX_PAYLOAD_SIZE} octeți")
+        return data
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SinglePayload:
+    """Un singur fișier de subtitrare (text simplu sau decomprimat din gzip)"""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+
+    def members(self):
+        return [self.name]
+
+    def read(self, name):
+        return self.data
+
+    def close(self):
+        self.data = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class VfsAccess:
+    """
+    Accesul la VFS-ul Kodi, furnizat de service.py (modulul rămâne fără xbmc):
+    listdir(url) -> (directoare, fișiere), read(url) -> octeți, iar 'temp_dir'
+    e directorul în care arhivele primite ca flux devin fișiere pentru VFS.
+    """
+
+    def __init__(self, listdir, read, temp_dir):
+        self.listdir = listdir
+        self.read = read
+        self.temp_dir = temp_dir
+
+
+class VfsPayload:
+    """Arhivă RAR/7z citită prin VFS-ul Kodi; membrii se citesc direct din arhivă"""
+
+    def __init__(self, vfs, root, temp_path=None):
+        self.vfs = vfs
+        self.root = root                # ex. archive://<cale codificată>/
+        self.temp_path = temp_path      # fișierul arhivei, șters la închidere
+        self._names = self._walk('', 0)
+
+    @classmethod
+    def open(cls, vfs, path, kind, temp_path=None):
+        """Prima schemă VFS care listează arhiva; UnsupportedPayload dacă niciuna"""
+        for scheme in VFS_SCHEMES[kind]:
+            try:
+                payload = cls(vfs, f"{scheme}://{quote(path, safe='')}/", temp_path)
+            except Exception:
+                continue
+            if payload.names():
+                return payload
+        addons = "vfs.libarchive" if kind == "7z" else "vfs.libarchive sau vfs.rar"
+        raise VfsUnavailable(f"arhivă {kind}: necesită {addons} în Kodi")
+
+    def _walk(self, prefix, depth):
+        dirs, files = self.vfs.listdir(self.root + prefix)
+        names = [prefix + name for name in files]
+        if depth < 4:
+            for directory in dirs:
+                names += self._walk(f"{prefix}{directory.rstrip('/')}/", depth + 1)
+        return names
+
+    def names(self):
+        return sorted(self._names)
+
+    def members(self):
+        return [n for n in self.names() if is_subtitle(n)]
+
+    def read(self, name):
+        data = self.vfs.read(self.root + name)
+        if len(data) > MAX_PAYLOAD_SIZE:
+            raise PayloadTooLarge(f"{name}: {len(data)} > {MAX_PAYLOAD_SIZE} octeți")
+        return data
+
+    def close(self):
+        if self.temp_path:
+            try:
+                os.remove(self.temp_path)
+            except OSError:
+                pass
+            self.temp_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NestedPayload:
+    """
+    Membrii subtitrare ai unei arhive, inclusiv din arhivele conținute (până la
+    MAX_NESTING niveluri), cu nume de forma 'interior.rar/episod.srt'.
+    """
+
+    def __init__(self, payload, vfs=None, depth=0):
+        self.payloads = []
+        self.index = {}
+        self.unavailable = None       # prima arhivă conținută pe care VFS n-a putut-o deschide
+        try:
+            self._add(payload, '', vfs, depth)
+            if not self.index and self.unavailable is not None:
+                raise self.unavailable
+        except BaseException:
+            self.close()
+            raise
+
+    def _add(self, payload, prefix, vfs, depth):
+        self.payloads.append(payload)
+        for name in payload.names():
+            if is_subtitle(name):
+                self.index[prefix + name] = (payload, name)
+            elif is_archive(name) and depth < MAX_NESTING:
+                try:
+                    inner = _open_nested(payload, name, vfs)
+                except VfsUnavailable as e:
+                    self.unavailable = self.unavailable or e
+                    continue
+                except Exception:
+                    continue          # arhivă conținută coruptă sau nesuportată: se ignoră
+                self._add(inner, f"{prefix}{name}/", vfs, depth + 1)
+
+    def members(self):
+        return sorted(self.index)
+
+    def read(self, name):
+        payload, inner = self.index[name]
+        return payload.read(inner)
+
+    def close(self):
+        for payload in self.payloads:
+            payload.close()
+        self.payloads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open_nested(parent, name, vfs):
+    """O arhivă conținută: din VFS direct prin URL imbricat, altfel din octeții citiți"""
+    if isinstance(parent, VfsPayload) and not name.lower().endswith('.zip'):
+        kind = 'rar' if name.lower().endswith('.rar') else '7z'
+        return VfsPayload.open(vfs, parent.root + name, kind)
+    data = parent.read(name)
+    kind = detect_format(data[:512])
+    if kind == 'zip':
+        return ZipPayload(io.BytesIO(data))
+    if kind in VFS_SCHEMES:
+        return _open_vfs(io.BytesIO(data), kind, name, vfs)
+    raise UnsupportedPayload(f"{name}: format nesuportat")
+
+
+def _open_vfs(fileobj, kind, name, vfs):
+    """Scrie arhiva RAR/7z într-un fișier temporar (doar arhiva) și o deschide prin VFS"""
+    if vfs is None:
+        raise VfsUnavailable(f"format nesuportat fără VFS: {kind}")
+    os.makedirs(vfs.temp_dir, exist_ok=True)
+    base = os.path.basename(name).rsplit('.', 1)[0] or 'subsro'
+    path = os.path.join(vfs.temp_dir, f"{base}.{uuid.uuid4().hex[:8]}.{kind}")
+    with open(path, 'wb') as f:
+        shutil.copyfileobj(fileobj, f)
+    try:
+        return VfsPayload.open(vfs, path, kind, temp_path=path)
+    except BaseException:
+        os.remove(path)
+        raise
+
+
+def open_payload(fileobj, name='subtitle', max_size=MAX_PAYLOAD_SIZE, vfs=None):
+    """
+    Deschide conținutul unui răspuns /download ca obiect cu members()/read().
+    'name' e folosit pentru fișierele care nu sunt arhive; 'vfs' (VfsAccess)
+    activează RAR/7z.
+    """
+    head = fileobj.read(512)
+    fileobj.seek(0)
+    kind = detect_format(head)
+
+    if kind == 'zip':
+        return NestedPayload(ZipPayload(fileobj), vfs)
+
+    if kind in VFS_SCHEMES:
+        return NestedPayload(_open_vfs(fileobj, kind, name, vfs), vfs)
+
+    if kind == 'gzip':
+        with gzip.GzipFile(fileobj=fileobj, mode='rb') as gz:
+            data = gz.read(max_size + 1)
+        if len(data) > max_size:
+            raise PayloadTooLarge(f"gzip decomprimat > {max_size} octeți")
+        if not looks_like_subtitle(data[:512]):
+            raise UnsupportedPayload("conținut gzip necunoscut")
+        base = os.path.splitext(name)[0] if name.lower().endswith('.gz') else name
+        return SinglePayload(_with_extension(base, data[:512]), data)
+
+    if kind == 'text':
+        return SinglePayload(_with_extension(name, head), fileobj.read())
+
+    raise UnsupportedPayload(f"format nesuportat: {kind or 'necunoscut'}")
+
+
+def _with_extension(name, head):
+    if name.lower().endswith(SUBTITLE_EXTENSIONS):
+        return name
+    return name + subtitle_extension(head)
+
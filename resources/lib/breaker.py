@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breaker pentru API-ul subs.ro, cu starea persistată în SQLite.
+După 'threshold' eșecuri consecutive (conexiune, timeout, HTTP 5xx) circuitul
+se deschide: invocările următoare ale addon-ului nu mai așteaptă timeout-ul,
+ci eșuează imediat. După pauza de răcire o singură cerere de probă trece
+(half-open); reușita închide circuitul, eșecul îl redeschide cu pauza dublată.
+Modificările sunt instrucțiuni UPDATE unice (eșecul: UPDATE + citire într-o
+tranzacție), deci sigure între procese; fiecare fir își deschide propria conexiune.
+"""
+import time
+
+from resources.lib.storage import open_db
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS breaker (
+    id            INTEGER PRIMARY KEY CHECK (id = 1),
+    failures      INTEGER NOT NULL,
+    trips         INTEGER NOT NULL,
+    opened_until  REAL NOT NULL,
+    probe         REAL NOT NULL
+);
+"""
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class CircuitOpen(Exception):
+    """Cerere refuzată local: API-ul e considerat indisponibil"""
+
+    def __init__(self, retry_in):
+        super().__init__(f"subs.ro indisponibil, reîncercare în {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Starea comună (închis / deschis / half-open) a conexiunii la API"""
+
+    def __init__(self, path, threshold=3, cooldown=60, max_cooldown=900, probe_timeout=30):
+        self.path = path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_timeout = probe_timeout   # o probă fără rezultat după atât e abandonată
+        self.conn = open_db(path, SCHEMA, SCHEMA_VERSION)
+        self.conn.execute("INSERT OR IGNORE INTO breaker (id, failures, trips, opened_until, probe) "
+                          "VALUES (1, 0, 0, 0, 0)")
+
+    def _row(self):
+        return self.conn.execute("SELECT failures, trips, opened_until, probe FROM breaker WHERE id=1").fetchone()
+
+    def state(self):
+        """(stare, secunde până la probă)"""
+        _, _, opened_until, _ = self._row()
+        if not opened_until:
+            return CLOSED, 0.0
+        remaining = opened_until - time.time()
+        return (OPEN, remaining) if remaining > 0 else (HALF_OPEN, 0.0)
+
+    def allow(self):
+        """
+        True dacă cererea poate pleca. În starea half-open doar primul apelant
+        (din orice proces) primește proba; ceilalți sunt refuzați până la rezultat.
+        """
+        state, _ = self.state()
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        now = time.time()
+        claimed = self.conn.execute(
+            "UPDATE breaker SET probe=? WHERE id=1 AND opened_until>0 AND opened_until<=? AND probe<?",
+            (now, now, now - self.probe_timeout)).rowcount
+        return claimed == 1
+
+    def check(self):
+        """Ca allow(), dar ridică CircuitOpen cu timpul rămas"""
+        if not self.allow():
+            raise CircuitOpen(max(self.state()[1], 0.0))
+
+    def record_success(self):
+        """Cerere reușită: circuitul se închide și contoarele se resetează"""
+        self.conn.execute("UPDATE breaker SET failures=0, trips=0, opened_until=0, probe=0 "
+                          "WHERE id=1 AND (failures>0 OR opened_until>0)")
+
+    def record_failure(self):
+        """
+        Cerere eșuată. La pragul de eșecuri sau la o probă eșuată circuitul se
+        (re)deschide, cu pauza dublată la fiecare deschidere (până la max_cooldown).
+        Returnează True dacă circuitul e acum deschis.
+        """
+        # Eșecurile cererilor pornite înainte de deschidere nu prelungesc pauza
+        trip = ("(opened_until = 0 AND failures + 1 >= :threshold) "
+                "OR (opened_until > 0 AND opened_until <= :now)")
+        now = time.time()
+        # Actualizarea și citirea stării în aceeași tranzacție: eșecurile
+        # paralele (alte fire / procese) nu se intercalează între ele
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE breaker SET "
+                f"  opened_until = CASE WHEN {trip} "
+                "    THEN :now + MIN(:max_cooldown, :cooldown * (1 << MIN(trips, 10))) ELSE opened_until END, "
+                f"  trips = CASE WHEN {trip} THEN trips + 1 ELSE trips END, "
+                "  failures = failures + 1, "
+                "  probe = 0 "
+                "WHERE id=1",
+                {'threshold': self.threshold, 'now': now, 'cooldown': self.cooldown,
+                 'max_cooldown': self.max_cooldown})
+            return self.state()[0] == OPEN
+        finally:
+            self.conn.execute("COMMIT")
+
+    def close(self):
+        self.conn.close()
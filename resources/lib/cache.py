@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Cache SQLite pentru rezultatele căutărilor.
+O singură bază indexată pe (field, value, language) și pe momentul expirării,
+cu limită totală de dimensiune (evacuare LRU) și ștergere în bloc a intrărilor expirate.
+Tabelul 'plans' ține minte, per element video, câmpul de căutare care a dat rezultate.
+Intrările expirate rămân încă 'grace' secunde, ca rezervă cât timp API-ul e indisponibil.
+Tabelul 'flights' coordonează invocările concurente: o singură invocare face
+cererea pentru o cheie, celelalte așteaptă intrarea ei în cache (single-flight).
+
+Intrările sunt compacte: doar câmpurile SubtitleItem folosite de listă și de
+descărcare, ca rânduri poziționale, plus caracteristicile de release deja
+parsate ale fiecărui titlu, totul comprimat cu zlib. La citire caracteristicile
+sunt preîncărcate în release, deci scorul nu mai parsează titlurile.
+"""
+import json, time, zlib
+
+from resources.lib import release
+from resources.lib.storage import open_db
+
+SCHEMA_VERSION = 4
+
+# Câmpurile SubtitleItem păstrate în cache (restul, ex. createdAt / meta, nu sunt folosite)
+ITEM_FIELDS = ('id', 'title', 'year', 'language', 'type', 'translator', 'poster',
+               'imdbid', 'tmdbid', 'description', 'link', 'downloadLink')
+DESCRIPTION_LIMIT = 300      # descrierea apare doar în plot
+_DESCRIPTION = ITEM_FIELDS.index('description')
+COMPRESS_LEVEL = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id        INTEGER PRIMARY KEY,
+    field     TEXT NOT NULL,
+    value     TEXT NOT NULL,
+    language  TEXT NOT NULL,
+    payload   BLOB NOT NULL,
+    size      INTEGER NOT NULL,
+    created   REAL NOT NULL,
+    expires   REAL NOT NULL,
+    accessed  REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_lookup ON entries(field, value, language);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries(expires);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed);
+CREATE TABLE IF NOT EXISTS plans (
+    item      TEXT PRIMARY KEY,
+    field     TEXT NOT NULL,
+    updated   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS flights (
+    field     TEXT NOT NULL,
+    value     TEXT NOT NULL,
+    language  TEXT NOT NULL,
+    claimed   REAL NOT NULL,
+    PRIMARY KEY (field, value, language)
+);
+"""
+
+# Câmpurile învățate se uită după această perioadă
+PLAN_TTL = 30 * 24 * 3600
+# Cât timp o intrare expirată mai poate fi servită când API-ul e indisponibil
+STALE_GRACE = 7 * 24 * 3600
+
+
+def pack(data):
+    """Răspunsul /search ca înregistrare compactă, comprimată"""
+    rows = []
+    for item in data.get('items', []):
+        row = [item.get(name) for name in ITEM_FIELDS]
+        description = row[_DESCRIPTION]
+        if isinstance(description, str) and len(description) > DESCRIPTION_LIMIT:
+            row[_DESCRIPTION] = description[:DESCRIPTION_LIMIT].rstrip() + '…'
+        row.append(release.to_features(release.parse_release(item.get('title') or '')))
+        rows.append(row)
+    record = {'status': data.get('status'), 'count': data.get('count', len(rows)), 'rows': rows}
+    return zlib.compress(json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                         COMPRESS_LEVEL)
+
+
+def unpack(payload):
+    """Inversul lui pack(): răspunsul cu itemii ca dicturi; caracteristicile intră în release"""
+    record = json.loads(zlib.decompress(payload))
+    items = []
+    preload = release.preload
+    for row in record['rows']:
+        features = row.pop()
+        item = dict(zip(ITEM_FIELDS, row))
+        if None in row:
+            # Câmpurile absente din răspunsul API rămân absente (valorile implicite din listă)
+            item = {name: value for name, value in item.items() if value is not None}
+        preload(item.get('title') or '', features)
+        items.append(item)
+    return {'status': record['status'], 'count': record['count'], 'items': items}
+
+
+class SearchCache:
+    """Cache persistent pentru răspunsurile GET /search"""
+
+    def __init__(self, path, ttl=3600, max_bytes=20 * 1024 * 1024, grace=STALE_GRACE):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.grace = grace
+        self.conn = open_db(path, SCHEMA, SCHEMA_VERSION)
+
+    def get(self, field, value, language):
+        """Returnează datele salvate sau None dacă lipsesc/au expirat"""
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT id, payload FROM entries "
+            "WHERE field=? AND value=? AND language=? AND expires>?",
+            (field, str(value), language, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("UPDATE entries SET accessed=? WHERE id=?", (now, row[0]))
+        try:
+            return unpack(row[1])
+        except (ValueError, KeyError, TypeError, zlib.error):
+            self.conn.execute("DELETE FROM entries WHERE id=?", (row[0],))
+            return None
+
+    def get_stale(self, field, value, language):
+        """
+        Rezerva pentru API indisponibil: (date, vechime în secunde) pentru o
+        intrare chiar expirată, dacă e încă în perioada de grație; altfel None.
+        """
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT payload, created FROM entries "
+            "WHERE field=? AND value=? AND language=? AND expires>?",
+            (field, str(value), language, now - self.grace)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return unpack(row[0]), now - row[1]
+        except (ValueError, KeyError, TypeError, zlib.error):
+            return None
+
+    def put(self, field, value, language, data):
+        """Salvează (sau înlocuiește) o intrare și aplică limita de dimensiune"""
+        now = time.time()
+        payload = pack(data)
+        size = len(payload)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries "
+            "(field, value, language, payload, size, created, expires, accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (field, str(value), language, payload, size, now, now + self.ttl, now)
+        )
+        self.enforce_size_limit()
+
+    def purge_expired(self, grace=None):
+        """Șterge în bloc intrările expirate de peste 'grace' secunde; returnează numărul lor"""
+        grace = self.grace if grace is None else grace
+        cur = self.conn.execute("DELETE FROM entries WHERE expires<=?", (time.time() - grace,))
+        self.conn.execute("DELETE FROM plans WHERE updated<=?", (time.time() - PLAN_TTL,))
+        return cur.rowcount
+
+    def enforce_size_limit(self):
+        """Evacuează intrările cel mai puțin recent folosite peste limita totală"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        # Sub presiune de spațiu, rezervele expirate pleacă primele
+        self.purge_expired(grace=0)
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+        victims = []
+        for entry_id, size in self.conn.execute("SELECT id, size FROM entries ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            victims.append((entry_id,))
+            total -= size
+        self.conn.executemany("DELETE FROM entries WHERE id=?", victims)
+        return len(victims)
+
+    def get_plan(self, item):
+        """Câmpul de căutare care a funcționat pentru element sau None"""
+        row = self.conn.execute("SELECT field FROM plans WHERE item=? AND updated>?",
+                                (item, time.time() - PLAN_TTL)).fetchone()
+        return row[0] if row else None
+
+    def put_plan(self, item, field):
+        """Ține minte câmpul de căutare care a dat rezultate pentru element"""
+        self.conn.execute("INSERT OR REPLACE INTO plans (item, field, updated) VALUES (?, ?, ?)",
+                          (item, field, time.time()))
+
+    def claim_flight(self, field, value, language, timeout):
+        """
+        Rezervă atomic cererea pentru o cheie. False dacă altă invocare o face
+        deja; o rezervare mai veche de 'timeout' secunde e considerată abandonată.
+        """
+        now = time.time()
+        self.conn.execute("DELETE FROM flights WHERE field=? AND value=? AND language=? AND claimed<?",
+                          (field, str(value), language, now - timeout))
+        return self.conn.execute("INSERT OR IGNORE INTO flights (field, value, language, claimed) "
+                                 "VALUES (?, ?, ?, ?)", (field, str(value), language, now)).rowcount == 1
+
+    def flight_active(self, field, value, language, timeout):
+        """True cât timp o altă invocare are cererea pentru cheie în curs"""
+        return self.conn.execute("SELECT 1 FROM flights WHERE field=? AND value=? AND language=? AND claimed>=?",
+                                 (field, str(value), language, time.time() - timeout)).fetchone() is not None
+
+    def release_flight(self, field, value, language):
+        self.conn.execute("DELETE FROM flights WHERE field=? AND value=? AND language=?",
+                          (field, str(value), language))
+
+    def clear(self):
+        """Golește complet cache-ul"""
+        self.conn.execute("DELETE FROM entries")
+        self.conn.execute("DELETE FROM plans")
+
+    def stats(self):
+        """Returnează (număr intrări, dimensiune totală în octeți)"""
+        return self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Client HTTP comun pentru API-ul subs.ro.
+O singură sesiune requests (keep-alive, pool de conexiuni) cu timeout-uri per
+endpoint și reîncercări cu backoff exponențial + jitter, respectând Retry-After.
+"""
+import random, time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Coduri pentru care o reîncercare are sens (limitare rată / erori temporare server)
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+DEFAULT_TIMEOUTS = {'quota': 5, 'search': 10, 'download': 15}
+
+
+def parse_retry_after(value, now=None):
+    """Interpretează header-ul Retry-After (secunde sau dată HTTP); None dacă lipsește"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (now if now is not None else time.time()))
+
+
+class ApiClient:
+    """Sesiune HTTP partajată, configurată o singură dată cu autentificarea"""
+
+    def __init__(self, headers, params=None, timeouts=None, retries=0,
+                 backoff_base=0.5, backoff_cap=8.0, max_retry_after=30.0,
+                 sleep=None, log=None):
+        self.params = dict(params or {})
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.retries = max(0, int(retries))
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_retry_after = max_retry_after
+        # sleep(secunde) -> True dacă trebuie abandonat (ex. Kodi se închide)
+        self.sleep = sleep or (lambda seconds: time.sleep(seconds) or False)
+        self.log = log or (lambda msg: None)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(headers)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Pauza înainte de reîncercarea 'attempt' (0 = prima reîncercare)"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay += retry_after
+        return delay
+
+    def get(self, endpoint, url, params=None, headers=None, stream=False):
+        """
+        GET cu reîncercări. 'endpoint' (quota/search/download) selectează timeout-ul.
+        Returnează ultimul răspuns primit; ridică excepția requests dacă nicio încercare
+        nu a primit răspuns.
+        """
+        query = dict(self.params, **(params or {}))
+        timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUTS['search'])
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(url, params=query, headers=headers,
+                                            timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                self.log(f"{endpoint}: {type(e).__name__}, reîncercare {attempt + 1}/{self.retries} în {delay:.1f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None and retry_after > self.max_retry_after:
+                    # Serverul cere o pauză prea lungă pentru un dialog interactiv
+                    return response
+                delay = self.backoff_delay(attempt, retry_after)
+                self.log(f"{endpoint}: HTTP {response.status_code}, reîncercare {attempt + 1}/{self.retries} în {delay:.1f}s")
+                response.close()
+
+            if self.sleep(delay):
+                raise requests.ConnectionError("Reîncercare abandonată")
+            attempt += 1
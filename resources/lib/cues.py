@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Parser pe replici pentru SRT și ASS/SSA. Textul decodat e parcurs o singură
+dată cu expresii precompilate (fără split pe linii sau blocuri); fiecare
+replică ocupă doar patru întregi în tablouri compacte: începutul și sfârșitul
+(ms) plus poziția timpilor în text. La scriere, textul original e copiat pe
+bucăți, iar doar timpii sunt reformatați: conversia de framerate și decalajul
+se aplică în aceeași trecere, fără o a doua copie a textului.
+"""
+import re
+from array import array
+
+FORMAT_SRT, FORMAT_ASS = 'srt', 'ass'
+
+# 00:01:02,345 --> 00:01:04,000 (ore opționale, virgulă sau punct)
+_SRT_TIMING = re.compile(
+    r'^[ \t]*(?:(\d{1,2}):)?(\d{1,2}):(\d{2})[,.](\d{1,3})[ \t]*-->[ \t]*'
+    r'(?:(\d{1,2}):)?(\d{1,2}):(\d{2})[,.](\d{1,3})', re.M)
+
+# Dialogue: 0,0:01:02.34,0:01:04.00,Default,... (și liniile Comment)
+_ASS_EVENT = re.compile(
+    r'^(?:Dialogue|Comment):[ \t]*[^,\n]*,[ \t]*(\d+):(\d{2}):(\d{2})[.:](\d{1,2}),'
+    r'[ \t]*(\d+):(\d{2}):(\d{2})[.:](\d{1,2})', re.M)
+
+_ASS_MARKERS = ('[Script Info]', '[Events]')
+
+# FPS în numele subtitrării: "23.976", "23976", "29.97", "25fps", "24 fps"
+_FPS_RE = re.compile(r'(?<!\d)(23[.,]?976|23[.,]98|29[.,]?97|59[.,]94|(?:24|25|30|50|60)(?=[ ._-]?fps))',
+                     re.I)
+_FPS_VALUES = {'23976': 23.976, '2398': 23.976, '2997': 29.97, '5994': 59.94}
+
+# Proporția maximă de replici cu timpi invalizi (sfârșit < început) acceptată
+MAX_BROKEN_RATIO = 0.1
+# Proporția minimă de linii de timp recunoscute din cele care conțin '-->' (SRT)
+MIN_PARSED_RATIO = 0.9
+
+
+class InvalidSubtitle(ValueError):
+    """Fișierul nu are structura de replici a formatului declarat"""
+
+
+class Timeline:
+    """Replicile unui fișier: timpi și poziții în tablouri, textul o singură dată"""
+    __slots__ = ('text', 'format', 'starts', 'ends', 'spans_from', 'spans_to')
+
+    def __init__(self, text, fmt):
+        self.text = text
+        self.format = fmt
+        self.starts = array('l')
+        self.ends = array('l')
+        self.spans_from = array('l')
+        self.spans_to = array('l')
+
+    def __len__(self):
+        return len(self.starts)
+
+
+def detect_format(name, text):
+    """'srt', 'ass' sau None (format netratat: textul se scrie nemodificat)"""
+    lower = name.lower()
+    if lower.endswith(('.ass', '.ssa')) or any(marker in text[:4096] for marker in _ASS_MARKERS):
+        return FORMAT_ASS
+    if lower.endswith('.srt') or '-->' in text[:4096]:
+        return FORMAT_SRT
+    return None
+
+
+def fps_from_name(name):
+    """FPS-ul menționat în numele unei subtitrări / release, dacă există"""
+    match = _FPS_RE.search(name)
+    if match is None:
+        return None
+    digits = match.group(1).replace('.', '').replace(',', '')
+    return _FPS_VALUES.get(digits) or float(digits)
+
+
+def _ms(hours, minutes, seconds, fraction, scale):
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(fraction) * scale
+
+
+def iter_cues(text, fmt):
+    """
+    Generator: (început ms, sfârșit ms, poziție timpi, sfârșit timpi) pentru
+    fiecare replică, în ordinea din fișier.
+    """
+    if fmt == FORMAT_SRT:
+        for m in _SRT_TIMING.finditer(text):
+            g = m.groups()
+            # Fracțiunea: '5' -> 500 ms, '34' -> 340 ms, '345' -> 345 ms
+            yield (_ms(g[0], g[1], g[2], g[3], 10 ** (3 - len(g[3]))),
+                   _ms(g[4], g[5], g[6], g[7], 10 ** (3 - len(g[7]))),
+                   m.start(2) if g[0] is None else m.start(1), m.end())
+    elif fmt == FORMAT_ASS:
+        for m in _ASS_EVENT.finditer(text):
+            g = m.groups()
+            yield (_ms(g[0], g[1], g[2], g[3], 10 ** (3 - len(g[3]))),
+                   _ms(g[4], g[5], g[6], g[7], 10 ** (3 - len(g[7]))),
+                   m.start(1), m.end())
+
+
+def parse(text, fmt):
+    """
+    Citește replicile într-un Timeline și validează structura.
+    Ridică InvalidSubtitle pentru fișiere fără replici, cu linii de timp
+    nerecunoscute sau cu prea multe replici cu durată negativă.
+    """
+    timeline = Timeline(text, fmt)
+    starts, ends = timeline.starts, timeline.ends
+    spans_from, spans_to = timeline.spans_from, timeline.spans_to
+    broken = 0
+    for start, end, span_from, span_to in iter_cues(text, fmt):
+        if end < start:
+            broken += 1
+        starts.append(start)
+        ends.append(end)
+        spans_from.append(span_from)
+        spans_to.append(span_to)
+
+    count = len(starts)
+    if count == 0:
+        raise InvalidSubtitle(f"nicio replică {fmt.upper()} recunoscută")
+    if broken > count * MAX_BROKEN_RATIO:
+        raise InvalidSubtitle(f"{broken} din {count} replici au timpi inversați")
+    if fmt == FORMAT_SRT and count < text.count('-->') * MIN_PARSED_RATIO:
+        raise InvalidSubtitle(f"doar {count} din {text.count('-->')} linii de timp sunt valide")
+    return timeline
+
+
+def _format_srt(ms):
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+
+def _format_ass(ms):
+    cs = (ms + 5) // 10
+    hours, cs = divmod(cs, 360000)
+    minutes, cs = divmod(cs, 6000)
+    seconds, cs = divmod(cs, 100)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}.{cs:02d}"
+
+
+def write(timeline, f, ratio=1.0, offset_ms=0):
+    """
+    Scrie replicile în fișierul text 'f', cu timpii convertiți:
+    t' = t * ratio + offset_ms (negativ -> 0). Restul textului e copiat exact.
+    """
+    text = timeline.text
+    if ratio == 1.0 and not offset_ms:
+        f.write(text)
+        return
+
+    if timeline.format == FORMAT_SRT:
+        fmt, separator = _format_srt, ' --> '
+    else:
+        fmt, separator = _format_ass, ','
+
+    position = 0
+    for start, end, span_from, span_to in zip(timeline.starts, timeline.ends,
+                                              timeline.spans_from, timeline.spans_to):
+        f.write(text[position:span_from])
+        f.write(fmt(max(0, int(round(start * ratio)) + offset_ms)))
+        f.write(separator)
+        f.write(fmt(max(0, int(round(end * ratio)) + offset_ms)))
+        position = span_to
+    f.write(text[position:])
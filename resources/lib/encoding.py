@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Detectarea codificării subtitrărilor românești.
+Octeții non-ASCII sunt extrași o singură dată; pentru fiecare codificare de
+8 biți candidată, histograma lor e redusă (prin bytes.translate, în C) la clase
+cu ponderi: diacritice românești (ă, â, î, ș/ş, ț/ţ), punctuație tipografică și
+caractere de control. Câștigă scorul cel mai mare, iar textul e decodat o
+singură dată, cu formele cu sedilă (ş, ţ) normalizate la virgulă dedesubt (ș, ț).
+"""
+import codecs, unicodedata
+
+# Codificări pe 8 biți, în ordinea preferinței la egalitate de scor
+CANDIDATES = ('cp1250', 'iso-8859-2', 'latin1')
+
+CEDILLA_TO_COMMA = (('ş', 'ș'), ('Ş', 'Ș'), ('ţ', 'ț'), ('Ţ', 'Ț'))
+
+ROMANIAN_LETTERS = frozenset('ăâîșşțţĂÂÎȘŞȚŢ')
+TYPOGRAPHIC = frozenset('„”“‘’…–—«»')
+
+# Clasă (octet în tabelul translate) -> pondere în scor
+CLASS_ROMANIAN, CLASS_TYPOGRAPHIC, CLASS_CONTROL, CLASS_OTHER = b'R', b'T', b'C', b'.'
+WEIGHTS = ((CLASS_ROMANIAN, 3), (CLASS_TYPOGRAPHIC, 1), (CLASS_CONTROL, -5))
+
+BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+_ASCII = bytes(range(0x80))
+
+
+def _normalize(text):
+    for cedilla, comma in CEDILLA_TO_COMMA:
+        if cedilla in text:
+            text = text.replace(cedilla, comma)
+    return text
+
+
+def _build_tables():
+    """Per codificare: (tabel charmap cu normalizare inclusă, tabel de clase)"""
+    tables = {}
+    for codec in CANDIDATES:
+        chars = []
+        classes = bytearray(CLASS_OTHER * 256)
+        for byte in range(256):
+            try:
+                ch = bytes([byte]).decode(codec)
+            except UnicodeDecodeError:
+                ch = '�'
+            if byte >= 0x80:
+                if ch in ROMANIAN_LETTERS:
+                    classes[byte] = CLASS_ROMANIAN[0]
+                elif ch in TYPOGRAPHIC:
+                    classes[byte] = CLASS_TYPOGRAPHIC[0]
+                elif ch == '�' or unicodedata.category(ch) in ('Cc', 'Cn'):
+                    classes[byte] = CLASS_CONTROL[0]
+            chars.append(_normalize(ch))
+        tables[codec] = (''.join(chars), bytes(classes))
+    return tables
+
+
+_TABLES = _build_tables()
+
+
+def high_bytes(data):
+    """Doar octeții non-ASCII (ASCII e eliminat în C, fără buclă Python)"""
+    return data.translate(None, _ASCII)
+
+
+def best_codepage(high, preferred=None):
+    """Codificarea de 8 biți cu cel mai mare scor pe octeții non-ASCII dați"""
+    order = list(CANDIDATES)
+    if preferred in order:
+        order.remove(preferred)
+        order.insert(0, preferred)
+
+    best, best_score = order[0], None
+    for codec in order:
+        classes = high.translate(_TABLES[codec][1])
+        score = sum(classes.count(cls) * weight for cls, weight in WEIGHTS)
+        if best_score is None or score > best_score:
+            best, best_score = codec, score
+    return best
+
+
+def decode(data, preferred=None):
+    """
+    Decodează subtitrarea și returnează (text, codificare).
+    UTF-8 se validează chiar prin decodare: pe fișierele de 8 biți eșuează la
+    primul octet non-ASCII, deci încercarea e aproape gratuită. Altfel,
+    codificarea de 8 biți e aleasă pe histogramă și textul e decodat o singură dată.
+    """
+    for bom, codec in BOMS:
+        if data.startswith(bom):
+            return _normalize(data.decode(codec, 'replace')), codec
+
+    try:
+        return _normalize(data.decode('utf-8')), 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    encoding = best_codepage(high_bytes(data), preferred)
+    return codecs.charmap_decode(data, 'replace', _TABLES[encoding][0])[0], encoding
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Istoricul alegerilor: amprenta fișierului redat (nume + dimensiune) -> subtitrarea
+activată pentru el, plus contoare per traducător și per release group din
+alegerile făcute de utilizator. Un fișier revăzut primește direct subtitrarea
+de data trecută; contoarele devin bonusuri în scorul de potrivire.
+Ambele tabele se citesc după cheia primară, iar contoarele sunt agregate,
+deci dimensiunea lor nu crește cu numărul de alegeri.
+"""
+import time
+
+from resources.lib.storage import open_db
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS choices (
+    fingerprint  TEXT PRIMARY KEY,
+    sub_id       INTEGER NOT NULL,
+    member       TEXT NOT NULL,
+    chosen       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS choices_chosen ON choices (chosen);
+CREATE TABLE IF NOT EXISTS preferences (
+    kind   TEXT NOT NULL,
+    name   TEXT NOT NULL,
+    picks  INTEGER NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+"""
+
+TRANSLATOR, GROUP = 'translator', 'group'
+MAX_CHOICES = 5000        # cele mai vechi amprente se șterg peste această limită
+
+
+def fingerprint(name, size):
+    """Amprenta unui fișier video: numele (fără cale, litere mici) și dimensiunea"""
+    return f"{name.lower()}:{int(size)}"
+
+
+class SelectionHistory:
+    """Alegerile per fișier și preferințele învățate din ele"""
+
+    def __init__(self, path, max_choices=MAX_CHOICES):
+        self.path = path
+        self.max_choices = max_choices
+        self.conn = open_db(path, SCHEMA, SCHEMA_VERSION)
+
+    def lookup(self, fingerprint):
+        """(sub_id, membru) ales ultima dată pentru amprentă, altfel None"""
+        row = self.conn.execute("SELECT sub_id, member FROM choices WHERE fingerprint=?",
+                                (fingerprint,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def record(self, fingerprint, sub_id, member, translator='', group='', learn=True):
+        """
+        Salvează alegerea pentru amprentă (o înlocuiește pe cea veche). Cu
+        learn=True (alegere făcută de utilizator) crește și contoarele
+        traducătorului și ale grupului.
+        """
+        preferences = [(kind, name.strip().lower()) for kind, name in ((TRANSLATOR, translator), (GROUP, group))
+                       if name and name.strip()] if learn else []
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO choices (fingerprint, sub_id, member, chosen) "
+                              "VALUES (?, ?, ?, ?)", (fingerprint, int(sub_id), member, time.time()))
+            for kind, name in preferences:
+                self.conn.execute("INSERT INTO preferences (kind, name, picks) VALUES (?, ?, 1) "
+                                  "ON CONFLICT (kind, name) DO UPDATE SET picks = picks + 1", (kind, name))
+            self.conn.execute("DELETE FROM choices WHERE chosen < (SELECT chosen FROM choices "
+                              "ORDER BY chosen DESC LIMIT 1 OFFSET ?)", (self.max_choices - 1,))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def forget(self, fingerprint):
+        self.conn.execute("DELETE FROM choices WHERE fingerprint=?", (fingerprint,))
+
+    def preferences(self):
+        """{(tip, nume): alegeri} pentru toți traducătorii și grupurile alese"""
+        return {(kind, name): picks for kind, name, picks in
+                self.conn.execute("SELECT kind, name, picks FROM preferences")}
+
+    def clear(self):
+        self.conn.execute("DELETE FROM choices")
+        self.conn.execute("DELETE FROM preferences")
+
+    def close(self):
+        self.conn.close()
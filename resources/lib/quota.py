@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Evidența locală a quota-ei API (schema QuotaInfo) și limitator de rată.
+Starea e persistată în SQLite, deci e partajată între invocările concurente
+ale addon-ului: /quota se interoghează doar când datele sunt vechi, iar
+fiecare căutare/descărcare scade local contorul. Reîmprospătarea din fundal
+lasă aici și rezultatul verificării cheii API, aplicat apoi de firul principal.
+"""
+import time
+
+from resources.lib.storage import open_db
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    total       INTEGER NOT NULL,
+    used        INTEGER NOT NULL,
+    remaining   INTEGER NOT NULL,
+    quota_type  TEXT,
+    fetched     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refresh (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    claimed     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS limiter (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    tokens      REAL NOT NULL,
+    updated     REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS key_check (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    key_hash    TEXT NOT NULL,
+    status      INTEGER NOT NULL
+);
+"""
+
+
+def key_hash(api_key):
+    """Amprenta cheii API (cheia însăși nu se scrie în baza de date)"""
+    import hashlib
+    return hashlib.sha1(api_key.encode('utf-8')).hexdigest()
+
+
+class QuotaTracker:
+    """Ultima stare QuotaInfo cunoscută, cu TTL, plus un token bucket comun"""
+
+    def __init__(self, path, ttl=900, rate=2.0, burst=5, refresh_timeout=30):
+        self.path = path
+        self.ttl = ttl
+        self.rate = rate            # cereri pe secundă (reumplere)
+        self.burst = burst          # capacitatea găleții
+        self.refresh_timeout = refresh_timeout
+        self.conn = open_db(path, SCHEMA, SCHEMA_VERSION)
+
+    def snapshot(self):
+        """Returnează ultima stare cunoscută (dict) sau None"""
+        row = self.conn.execute(
+            "SELECT total, used, remaining, quota_type, fetched FROM quota WHERE id=1"
+        ).fetchone()
+        if row is None:
+            return None
+        return {'total_quota': row[0], 'used_quota': row[1], 'remaining_quota': row[2],
+                'quota_type': row[3], 'fetched': row[4]}
+
+    def is_stale(self, snapshot=None):
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        return snapshot is None or time.time() - snapshot['fetched'] > self.ttl
+
+    def update(self, quota_info):
+        """Salvează un QuotaInfo proaspăt primit de la /quota"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO quota (id, total, used, remaining, quota_type, fetched) "
+            "VALUES (1, ?, ?, ?, ?, ?)",
+            (int(quota_info.get('total_quota', 0) or 0),
+             int(quota_info.get('used_quota', 0) or 0),
+             int(quota_info.get('remaining_quota', 0) or 0),
+             quota_info.get('quota_type', 'unknown'),
+             time.time())
+        )
+        self.conn.execute("DELETE FROM refresh")
+
+    def consume(self, count=1):
+        """Scade local quota după o cerere reușită"""
+        self.conn.execute(
+            "UPDATE quota SET remaining=MAX(remaining-?, 0), used=used+? WHERE id=1",
+            (count, count)
+        )
+
+    def claim_refresh(self):
+        """
+        Rezervă atomic dreptul de a reîmprospăta quota, ca invocările concurente
+        să nu trimită fiecare propria cerere /quota.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT claimed FROM refresh WHERE id=1").fetchone()
+            if row is not None and now - row[0] < self.refresh_timeout:
+                return False
+            self.conn.execute("INSERT OR REPLACE INTO refresh (id, claimed) VALUES (1, ?)", (now,))
+            return True
+        finally:
+            self.conn.execute("COMMIT")
+
+    def release_refresh(self):
+        self.conn.execute("DELETE FROM refresh")
+
+    def record_key_status(self, api_key, status):
+        """Codul HTTP al ultimei verificări /quota pentru cheia dată"""
+        self.conn.execute("INSERT OR REPLACE INTO key_check (id, key_hash, status) VALUES (1, ?, ?)",
+                          (key_hash(api_key), int(status)))
+
+    def take_key_status(self, api_key):
+        """
+        Codul verificării nepreluate încă pentru cheia curentă, apoi îl șterge
+        (o singură invocare îl aplică). Rezultatul unei chei vechi e ignorat.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT key_hash, status FROM key_check WHERE id=1").fetchone()
+            if row is None:
+                return None
+            self.conn.execute("DELETE FROM key_check")
+            return row[1] if row[0] == key_hash(api_key) else None
+        finally:
+            self.conn.execute("COMMIT")
+
+    def acquire(self, cost=1):
+        """
+        Cere permisiunea pentru o cerere API.
+        Returnează (permis, așteptare_secunde); așteptarea e None dacă quota
+        cunoscută (și încă validă) este epuizată.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT remaining, fetched FROM quota WHERE id=1").fetchone()
+            if row is not None and row[0] < cost and now - row[1] <= self.ttl:
+                return False, None
+
+            row = self.conn.execute("SELECT tokens, updated FROM limiter WHERE id=1").fetchone()
+            if row is None:
+                tokens = float(self.burst)
+            else:
+                tokens = min(float(self.burst), row[0] + (now - row[1]) * self.rate)
+
+            if tokens < cost:
+                return False, (cost - tokens) / self.rate
+
+            self.conn.execute("INSERT OR REPLACE INTO limiter (id, tokens, updated) VALUES (1, ?, ?)",
+                              (tokens - cost, now))
+            return True, 0.0
+        finally:
+            self.conn.execute("COMMIT")
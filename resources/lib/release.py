@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Parser pentru nume de release (fișier video, titlu subtitrare, membru arhivă).
+Numele e tokenizat o singură dată cu expresii precompilate într-un ReleaseInfo
+compact; rezultatele sunt memorate per nume. Caracteristicile salvate deja
+(ex. în cache, odată cu rezultatele căutării) pot fi preîncărcate, ca numele
+respective să nu mai fie parsate deloc.
+"""
+import re
+from functools import lru_cache
+
+_TOKEN_RE    = re.compile(r'[a-z0-9]+')
+_EPISODE_RE  = re.compile(r's(\d+)e(\d+)')
+_SEASON_RE   = re.compile(r'\b(?:s|season|sezon|sezonul)[ ._-]?(\d{1,2})\b')
+_GROUP_RE    = re.compile(r'-([a-z0-9]+)(?:\.[a-z0-9]+)?$')
+_PRIORITY_RE = re.compile(r'subrip|retail|netflix|hbo|amazon')
+
+# token -> (rezoluție normalizată, rang); la mai multe potriviri câștigă rangul mic
+RESOLUTIONS = {
+    '2160p': ('2160p', 0), '4320p': ('2160p', 0), '4k': ('2160p', 1), 'uhd': ('2160p', 2),
+    '1080p': ('1080p', 3), '1080i': ('1080p', 3), 'fhd': ('1080p', 3),
+    '720p':  ('720p', 4),
+    '480p':  ('480p', 5),
+}
+
+# token -> (sursă, rang); la conflict câștigă rangul mare (hdtv > web > bluray)
+SOURCES = {
+    'bluray': ('bluray', 0), 'blu': ('bluray', 0), 'bdrip': ('bluray', 0),
+    'brrip': ('bluray', 0), 'remux': ('bluray', 0), 'bdremux': ('bluray', 0),
+    'web': ('web', 1), 'webdl': ('web', 1), 'webrip': ('web', 1),
+    'amzn': ('web', 1), 'nf': ('web', 1), 'netflix': ('web', 1),
+    'hdtv': ('hdtv', 2), 'pdtv': ('hdtv', 2),
+}
+
+
+class ReleaseInfo:
+    """Caracteristicile extrase dintr-un nume de release"""
+    __slots__ = ('name', 'season', 'episode', 'resolution', 'source',
+                 'group', 'priority', 'tokens')
+
+    def __init__(self, name, season, episode, resolution, source, group, priority, tokens):
+        self.name = name
+        self.season = season
+        self.episode = episode
+        self.resolution = resolution
+        self.source = source
+        self.group = group
+        self.priority = priority
+        self.tokens = tokens
+
+    @property
+    def episode_key(self):
+        """(sezon, episod) sau None"""
+        if self.season is None or self.episode is None:
+            return None
+        return self.season, self.episode
+
+    def __repr__(self):
+        return (f"ReleaseInfo({self.name!r}, S{self.season}E{self.episode}, "
+                f"{self.resolution}, {self.source}, {self.group})")
+
+
+# nume -> ReleaseInfo reconstruit din caracteristici salvate (vezi preload)
+_PRELOADED = {}
+MAX_PRELOADED = 4096
+
+
+def parse_release(name):
+    """Tokenizează un nume de release într-un ReleaseInfo (rezultat memorat)"""
+    info = _PRELOADED.get(name)
+    return info if info is not None else _parse(name)
+
+
+def to_features(info):
+    """Caracteristicile unui ReleaseInfo ca listă compactă, serializabilă JSON"""
+    return [info.season, info.episode, info.resolution, info.source, info.group,
+            info.priority, ' '.join(info.tokens)]
+
+
+def preload(name, features):
+    """Înregistrează caracteristicile deja calculate (to_features) pentru un nume"""
+    if name in _PRELOADED:
+        return
+    if len(_PRELOADED) >= MAX_PRELOADED:
+        _PRELOADED.clear()
+    season, episode, resolution, source, group, priority, tokens = features
+    _PRELOADED[name] = ReleaseInfo(name, season, episode, resolution, source, group, priority,
+                                   tuple(tokens.split()))
+
+
+@lru_cache(maxsize=4096)
+def _parse(name):
+    lower = name.lower()
+    tokens = tuple(_TOKEN_RE.findall(lower))
+
+    season = episode = None
+    match = _EPISODE_RE.search(lower)
+    if match:
+        season, episode = int(match.group(1)), int(match.group(2))
+    else:
+        # Pachet de sezon ("S02", "Season 2"): doar sezonul e cunoscut
+        match = _SEASON_RE.search(lower)
+        if match:
+            season = int(match.group(1))
+
+    resolution = source = None
+    res_rank = len(RESOLUTIONS)
+    src_rank = -1
+    for token in tokens:
+        res = RESOLUTIONS.get(token)
+        if res is not None and res[1] < res_rank:
+            resolution, res_rank = res
+            continue
+        src = SOURCES.get(token)
+        if src is not None and src[1] > src_rank:
+            source, src_rank = src
+
+    match = _GROUP_RE.search(lower)
+    group = match.group(1) if match else None
+
+    return ReleaseInfo(
+        name=name,
+        season=season,
+        episode=episode,
+        resolution=resolution,
+        source=source,
+        group=group,
+        priority=_PRIORITY_RE.search(lower) is not None,
+        tokens=tokens,
+    )
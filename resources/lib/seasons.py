@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Index local pe sezoane: rezultatele unei căutări pentru un serial sunt împărțite
+pe (serial, sezon, episod), iar membrii arhivelor de sezon descărcate sunt
+mapați pe episoadele pe care le conțin. Episoadele următoare ale aceluiași
+sezon sunt servite din index, fără o nouă căutare. Fiecare rezultat e salvat
+cu caracteristicile de release deja parsate (preîncărcate la citire).
+"""
+import json, time
+
+from resources.lib.release import parse_release, preload, to_features
+from resources.lib.storage import open_db
+
+SCHEMA_VERSION = 2
+
+# episode = SEASON_PACK pentru subtitrările care acoperă tot sezonul
+SEASON_PACK = -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seasons (
+    show      TEXT NOT NULL,
+    season    INTEGER NOT NULL,
+    expires   REAL NOT NULL,
+    PRIMARY KEY (show, season)
+);
+CREATE TABLE IF NOT EXISTS items (
+    show      TEXT NOT NULL,
+    season    INTEGER NOT NULL,
+    episode   INTEGER NOT NULL,
+    sub_id    INTEGER NOT NULL,
+    item      TEXT NOT NULL,
+    PRIMARY KEY (show, season, episode, sub_id)
+);
+CREATE TABLE IF NOT EXISTS packs (
+    sub_id    INTEGER NOT NULL,
+    season    INTEGER NOT NULL,
+    episode   INTEGER NOT NULL,
+    member    TEXT NOT NULL,
+    PRIMARY KEY (sub_id, season, episode)
+);
+"""
+
+
+def show_key(title):
+    """Cheia normalizată a unui serial (tokeni alfanumerici, litere mici)"""
+    return ' '.join(parse_release(title).tokens)
+
+
+class SeasonIndex:
+    """(serial, sezon, episod) -> subtitrări candidate"""
+
+    def __init__(self, path, ttl=3600):
+        self.path = path
+        self.ttl = ttl
+        self.conn = open_db(path, SCHEMA, SCHEMA_VERSION)
+
+    def add_items(self, show, season, items):
+        """
+        Indexează rezultatele unei căutări. Fiecare titlu e parsat: S##E## ->
+        episodul respectiv, doar sezonul -> pachet de sezon, nimic -> pachet
+        al sezonului căutat. Sezoanele atinse sunt reîmprospătate complet.
+        Returnează numărul de rânduri indexate.
+        """
+        rows = []
+        for item in items:
+            try:
+                sub_id = int(item.get('id'))
+            except (TypeError, ValueError):
+                continue
+            info = parse_release(item.get('title', ''))
+            item_season = info.season if info.season is not None else season
+            item_episode = info.episode if info.episode is not None else SEASON_PACK
+            rows.append((show, item_season, item_episode, sub_id,
+                         json.dumps([item, to_features(info)], ensure_ascii=False, separators=(',', ':'))))
+
+        expires = time.time() + self.ttl
+        seasons = {row[1] for row in rows} | {season}
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for indexed in seasons:
+                self.conn.execute("DELETE FROM items WHERE show=? AND season=?", (show, indexed))
+                self.conn.execute("INSERT OR REPLACE INTO seasons (show, season, expires) VALUES (?, ?, ?)",
+                                  (show, indexed, expires))
+            self.conn.executemany("INSERT OR REPLACE INTO items (show, season, episode, sub_id, item) "
+                                  "VALUES (?, ?, ?, ?, ?)", rows)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def add_members(self, sub_id, members):
+        """Mapează membrii unei arhive (pachet de sezon) pe episoadele lor"""
+        rows = []
+        for member in members:
+            key = parse_release(member.rsplit('/', 1)[-1]).episode_key
+            if key is not None:
+                rows.append((int(sub_id), key[0], key[1], member))
+        if rows:
+            self.conn.executemany("INSERT OR REPLACE INTO packs (sub_id, season, episode, member) "
+                                  "VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def lookup(self, show, season, episode):
+        """
+        Candidații pentru un episod, dacă sezonul e indexat și nu a expirat.
+        Returnează None dacă indexul nu poate răspunde sigur: sezon neindexat
+        sau niciun candidat cert (titlu S##E## sau pachet cu episodul în arhivă).
+        """
+        row = self.conn.execute("SELECT expires FROM seasons WHERE show=? AND season=?",
+                                (show, season)).fetchone()
+        if row is None or row[0] <= time.time():
+            return None
+
+        exact = False
+        items = []
+        rows = self.conn.execute(
+            "SELECT i.episode, i.item, "
+            "  (SELECT COUNT(*) FROM packs p WHERE p.sub_id = i.sub_id), "
+            "  (SELECT COUNT(*) FROM packs p WHERE p.sub_id = i.sub_id AND p.season = i.season AND p.episode = ?) "
+            "FROM items i WHERE i.show=? AND i.season=? AND i.episode IN (?, ?)",
+            (episode, show, season, episode, SEASON_PACK)
+        )
+        for item_episode, item, known, covered in rows:
+            if item_episode == episode or covered:
+                exact = True
+            elif known:
+                continue  # pachet descărcat deja, fără acest episod
+            item, features = json.loads(item)
+            preload(item.get('title', ''), features)
+            items.append(item)
+        return items if exact else None
+
+    def clear(self):
+        """Golește tot indexul"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        for table in ('seasons', 'items', 'packs'):
+            self.conn.execute(f"DELETE FROM {table}")
+        self.conn.execute("COMMIT")
+
+    def purge_expired(self):
+        """Șterge sezoanele expirate și rezultatele lor"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.execute("DELETE FROM items WHERE EXISTS (SELECT 1 FROM seasons s WHERE "
+                          "s.show = items.show AND s.season = items.season AND s.expires <= ?)", (now,))
+        removed = self.conn.execute("DELETE FROM seasons WHERE expires <= ?", (now,)).rowcount
+        self.conn.execute("DELETE FROM packs WHERE sub_id NOT IN (SELECT sub_id FROM items)")
+        self.conn.execute("COMMIT")
+        return removed
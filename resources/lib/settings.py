@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Instantaneu imuabil al setărilor addon-ului, citit o singură dată per invocare.
+Fiecare getSetting trece prin stratul de setări C++ al Kodi; aici valorile sunt
+citite o dată și convertite la bool / int, apoi accesate ca atribute simple.
+"""
+
+# (id, tip, valoare implicită) — aceleași id-uri și valori implicite ca în settings.xml.
+# Setările de tip enum sunt păstrate ca indici int.
+FIELDS = (
+    ('api_key', str, ''),
+    ('check_quota', bool, True),
+    ('auth_method', int, 0),
+    ('search_language', int, 0),
+    ('search_language_2', int, 0),
+    ('search_language_3', int, 0),
+    ('api_key_validated', bool, False),
+    ('download_mode', int, 0),
+    ('auto_threshold', int, 50),
+    ('use_selection_history', bool, True),
+    ('enable_matchmaking', bool, True),
+    ('match_episode', bool, True),
+    ('match_source', bool, True),
+    ('match_release_group', bool, True),
+    ('match_resolution', bool, False),
+    ('prefer_retail', bool, True),
+    ('show_match_scores', bool, False),
+    ('filter_by_hearing_impaired', bool, False),
+    ('filter_by_fps', bool, False),
+    ('subtitle_fps', int, 0),
+    ('subtitle_offset', int, 0),
+    ('min_rating', int, 0),
+    ('collapse_duplicates', bool, True),
+    ('results_page_size', int, 30),
+    ('cache_results', bool, True),
+    ('cache_duration', int, 60),
+    ('clear_cache_on_startup', bool, False),
+    ('cache_max_size', int, 20),
+    ('store_max_size', int, 50),
+    ('prefetch_on_playback', bool, True),
+    ('prefetch_next', bool, True),
+    ('encoding_priority', int, 0),
+    ('multi_episode_handling', int, 2),
+    ('retry_failed_downloads', bool, True),
+    ('retry_attempts', int, 3),
+    ('timeout_duration', int, 10),
+    ('notify_auto_download', bool, True),
+    ('notify_no_match', bool, True),
+    ('notify_cache_hit', bool, False),
+    ('notify_quota_warning', bool, True),
+    ('notify_duration', int, 3),
+    ('notify_sound', bool, False),
+    ('debug_log', bool, False),
+    ('log_api_requests', bool, False),
+    ('log_matchmaking', bool, False),
+    ('log_cache_operations', bool, False),
+    ('telemetry_enabled', bool, True),
+    ('profile_next_invocation', bool, False),
+)
+
+_TYPES = {name: (kind, default) for name, kind, default in FIELDS}
+
+
+def parse(name, raw):
+    """Convertește șirul returnat de getSetting la tipul setării"""
+    kind, default = _TYPES[name]
+    if raw is None or raw == '':
+        return default
+    if kind is bool:
+        return raw == 'true'
+    if kind is int:
+        try:
+            return int(float(raw))
+        except ValueError:
+            return default
+    return raw
+
+
+def format_value(value):
+    """Valoarea în forma așteptată de setSetting"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+class Settings:
+    """Setările addon-ului ca atribute tipizate; modificările creează un nou instantaneu"""
+
+    __slots__ = tuple(name for name, _, _ in FIELDS)
+
+    def __init__(self, values):
+        for name, _, default in FIELDS:
+            object.__setattr__(self, name, values.get(name, default))
+
+    @classmethod
+    def load(cls, get_setting):
+        """Citește toate setările printr-o funcție de tip Addon.getSetting"""
+        return cls({name: parse(name, get_setting(name)) for name, _, _ in FIELDS})
+
+    def replace(self, **changes):
+        """Un instantaneu nou, cu valorile date înlocuite"""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return Settings(values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings este imuabil; folosește replace()")
+
+    def __repr__(self):
+        shown = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__ if name != 'api_key')
+        return f"Settings({shown})"
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Similaritate între numele video și lista de subtitrări candidate, calculată
+în lot pe seturi precalculate de tokeni și trigrame (coeficient Dice).
+Seturile video se calculează o singură dată per lot, iar cele ale candidaților
+sunt memorate între căutări.
+"""
+from functools import lru_cache
+
+# Ponderea tokenilor întregi vs. trigramelor de caractere în scorul final
+TOKEN_WEIGHT = 0.5
+GRAM_WEIGHT = 1.0 - TOKEN_WEIGHT
+
+
+@lru_cache(maxsize=4096)
+def features(tokens):
+    """(set tokeni, set trigrame) pentru un tuplu de tokeni"""
+    text = ' ' + ' '.join(tokens) + ' '
+    grams = frozenset(text[i:i + 3] for i in range(len(text) - 2))
+    return frozenset(tokens), grams
+
+
+def _dice(a, b):
+    total = len(a) + len(b)
+    return 2.0 * len(a & b) / total if total else 0.0
+
+
+def batch_similarity(video, candidates):
+    """
+    Returnează lista de similarități [0, 1] dintre 'video' și fiecare candidat
+    (obiecte cu atributul 'tokens', ex. ReleaseInfo), în ordinea candidaților.
+    """
+    video_tokens, video_grams = features(video.tokens)
+
+    scores = []
+    append = scores.append
+    for candidate in candidates:
+        tokens, grams = features(candidate.tokens)
+        append(TOKEN_WEIGHT * _dice(video_tokens, tokens) +
+               GRAM_WEIGHT * _dice(video_grams, grams))
+    return scores
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Utilitare comune pentru bazele SQLite din profilul addon-ului"""
+import os, sqlite3
+
+
+def open_db(path, schema, version=1):
+    """
+    Deschide (și creează la nevoie) o bază SQLite în mod autocommit.
+    Dacă versiunea schemei diferă (PRAGMA user_version), tabelele vechi sunt
+    șterse și recreate — bazele gestionate aici conțin doar date reconstruibile.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+    except sqlite3.OperationalError:
+        # Unele sisteme de fișiere (SMB/NFS) nu suportă WAL
+        pass
+    conn.execute('PRAGMA synchronous=NORMAL')
+
+    current = conn.execute('PRAGMA user_version').fetchone()[0]
+    if current != version:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+        for table in tables:
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.executescript(schema)
+        conn.execute(f'PRAGMA user_version={int(version)}')
+    return conn
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Depozit local pentru subtitrările descărcate, adresat după conținut.
+Textul decodat (UTF-8) e salvat o singură dată per hash SHA-1, iar perechea
+(id subtitrare, membru arhivă) indică spre el. Activările repetate ale
+aceleiași subtitrări se servesc local, fără rețea și fără quota.
+"""
+import hashlib, json, time
+
+from resources.lib.storage import open_db
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    sub_id    INTEGER PRIMARY KEY,
+    members   TEXT NOT NULL,
+    created   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    sub_id    INTEGER NOT NULL,
+    member    TEXT NOT NULL,
+    digest    TEXT NOT NULL,
+    PRIMARY KEY (sub_id, member)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_digest ON entries(digest);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest    TEXT PRIMARY KEY,
+    text      TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    accessed  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_accessed ON blobs(accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name      TEXT PRIMARY KEY,
+    value     INTEGER NOT NULL
+);
+"""
+
+
+class SubtitleStore:
+    """Subtitrări decodate, cu limită de dimensiune și evacuare LRU"""
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.conn = open_db(path, SCHEMA, SCHEMA_VERSION)
+
+    def members(self, sub_id):
+        """Lista membrilor arhivei pentru un id, dacă a mai fost descărcată"""
+        row = self.conn.execute("SELECT members FROM archives WHERE sub_id=?", (int(sub_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get(self, sub_id, member):
+        """Textul salvat pentru (id, membru) sau None"""
+        row = self.conn.execute(
+            "SELECT b.digest, b.text FROM entries e JOIN blobs b ON b.digest = e.digest "
+            "WHERE e.sub_id=? AND e.member=?",
+            (int(sub_id), member)
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("UPDATE blobs SET accessed=? WHERE digest=?", (time.time(), row[0]))
+        return row[1]
+
+    def put(self, sub_id, members, member, text):
+        """Salvează lista membrilor arhivei și textul decodat al unui membru"""
+        now = time.time()
+        data = text.encode('utf-8')
+        digest = hashlib.sha1(data).hexdigest()
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO archives (sub_id, members, created) VALUES (?, ?, ?)",
+                              (int(sub_id), json.dumps(list(members), ensure_ascii=False), now))
+            self.conn.execute("INSERT OR IGNORE INTO blobs (digest, text, size, accessed) VALUES (?, ?, ?, ?)",
+                              (digest, text, len(data), now))
+            self.conn.execute("UPDATE blobs SET accessed=? WHERE digest=?", (now, digest))
+            self.conn.execute("INSERT OR REPLACE INTO entries (sub_id, member, digest) VALUES (?, ?, ?)",
+                              (int(sub_id), member, digest))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.enforce_size_limit()
+
+    def enforce_size_limit(self):
+        """Evacuează conținutul cel mai puțin recent folosit peste limita totală"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        victims = []
+        for digest, size in self.conn.execute("SELECT digest, size FROM blobs ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            victims.append((digest,))
+            total -= size
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany("DELETE FROM entries WHERE digest=?", victims)
+        self.conn.executemany("DELETE FROM blobs WHERE digest=?", victims)
+        self.conn.execute("DELETE FROM archives WHERE sub_id NOT IN (SELECT sub_id FROM entries)")
+        self.conn.execute("COMMIT")
+        return len(victims)
+
+    def count(self, name):
+        """Incrementează un contor persistent (ex. 'hits', 'misses')"""
+        self.conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def stats(self):
+        """Contoare hit/miss plus numărul și dimensiunea textelor salvate"""
+        counters = dict(self.conn.execute("SELECT name, value FROM counters"))
+        blobs, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return {'hits': counters.get('hits', 0), 'misses': counters.get('misses', 0),
+                'entries': blobs, 'bytes': size}
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Măsurători per invocare: durata fiecărei etape (span-uri), contoare (cache
+hit/miss, rezultate, octeți transferați) și, opțional, detalii per cerere.
+La final se adaugă o singură linie JSON într-un fișier din profilul addon-ului.
+Profiler combină cProfile și tracemalloc pentru o singură invocare.
+"""
+import json, os, time
+from contextlib import contextmanager
+
+MAX_LOG_SIZE = 1024 * 1024   # peste această dimensiune fișierul e rotit (.1)
+TOP_ALLOCATIONS = 25
+
+
+class Telemetry:
+    """Înregistrarea unei invocări; span-urile cu același nume se cumulează"""
+
+    def __init__(self, action):
+        self.started = time.time()
+        self.clock = time.perf_counter()
+        self.record = {'action': action, 'spans': {}, 'counters': {}}
+        self.events = []
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            spans = self.record['spans']
+            spans[name] = spans.get(name, 0.0) + (time.perf_counter() - start) * 1000.0
+
+    def count(self, name, value=1):
+        counters = self.record['counters']
+        counters[name] = counters.get(name, 0) + value
+
+    def set(self, name, value):
+        self.record[name] = value
+
+    def event(self, kind, **fields):
+        """Detaliu opțional (ex. o cerere API), păstrat în ordinea apariției"""
+        fields['kind'] = kind
+        fields['at_ms'] = round((time.perf_counter() - self.clock) * 1000.0, 1)
+        self.events.append(fields)
+
+    def finish(self):
+        """Înregistrarea finală, cu duratele rotunjite la 0.1 ms"""
+        record = dict(self.record)
+        record['ts'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started))
+        record['total_ms'] = round((time.perf_counter() - self.clock) * 1000.0, 1)
+        record['spans'] = {name: round(ms, 1) for name, ms in self.record['spans'].items()}
+        if self.events:
+            record['events'] = self.events
+        return record
+
+
+def append_record(path, record, max_bytes=MAX_LOG_SIZE):
+    """Adaugă o linie JSON; fișierul prea mare e păstrat o singură dată ca '.1'"""
+    try:
+        if os.path.getsize(path) > max_bytes:
+            os.replace(path, path + '.1')
+    except OSError:
+        pass
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+class Profiler:
+    """cProfile + tracemalloc pe durata unei singure invocări"""
+
+    def __init__(self, top=TOP_ALLOCATIONS):
+        self.top = top
+        self.profile = None
+
+    def start(self):
+        import cProfile, tracemalloc
+        tracemalloc.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, directory, prefix):
+        """Scrie '<prefix>.pstats' și '<prefix>.tracemalloc.txt'; returnează căile"""
+        import tracemalloc
+        self.profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        os.makedirs(directory, exist_ok=True)
+        pstats_path = os.path.join(directory, prefix + '.pstats')
+        self.profile.dump_stats(pstats_path)
+
+        memory_path = os.path.join(directory, prefix + '.tracemalloc.txt')
+        with open(memory_path, 'w', encoding='utf-8') as f:
+            f.write(f"curent: {current} octeți, vârf: {peak} octeți\n\n")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                f.write(f"{stat}\n")
+        return pstats_path, memory_path
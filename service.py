@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import xbmc, xbmcgui, xbmcaddon, xbmcplugin, xbmcvfs
-import requests, os, sys, urllib.parse, zipfile, difflib, re, json, time
+import os, sys, urllib.parse, json, time, threading, heapq
+
+from resources.lib import breaker, cache, history, quota, release, seasons, settings, similarity, telemetry
 
 ADDON = xbmcaddon.Addon()
 API_BASE = "https://api.subs.ro/v1.0"
@@ -9,14 +11,52 @@ API_BASE = "https://api.subs.ro/v1.0"
 #                           FUNCȚII UTILITARE
 # ============================================================================
 
+_SETTINGS = None
+
+def get_settings():
+    """Instantaneul setărilor pentru invocarea curentă (citit o singură dată)"""
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = settings.Settings.load(ADDON.getSetting)
+    return _SETTINGS
+
+def load_settings():
+    """Recitește setările din Kodi (la intrare sau după modificarea lor)"""
+    global _SETTINGS
+    _SETTINGS = settings.Settings.load(ADDON.getSetting)
+    return _SETTINGS
+
+def set_setting(name, value):
+    """Scrie o setare în Kodi și actualizează instantaneul"""
+    global _SETTINGS
+    ADDON.setSetting(name, settings.format_value(value))
+    _SETTINGS = get_settings().replace(**{name: value})
+
 def log(msg, level=xbmc.LOGINFO):
     """Logging cu control prin setări"""
-    if ADDON.getSetting('debug_log') == 'true':
+    if get_settings().debug_log:
         xbmc.log(f"[Subs.ro] {msg}", level)
 
+# Categorie de detaliu -> setarea care o activează (pe lângă 'debug_log')
+LOG_DETAIL_SETTINGS = {
+    'api': 'log_api_requests',
+    'matchmaking': 'log_matchmaking',
+    'cache': 'log_cache_operations',
+}
+
+def log_enabled(category):
+    """True dacă detaliile categoriei ('api', 'matchmaking', 'cache') sunt activate"""
+    cfg = get_settings()
+    return cfg.debug_log and getattr(cfg, LOG_DETAIL_SETTINGS[category])
+
+def log_detail(category, msg):
+    """Log detaliat, doar dacă setarea categoriei e activă"""
+    if log_enabled(category):
+        xbmc.log(f"[Subs.ro] {msg}", xbmc.LOGINFO)
+
 def get_api_key():
     """Obține cheia API din setări - OBLIGATORIU pentru funcționare"""
-    api_key = ADDON.getSetting('api_key')
+    api_key = get_settings().api_key
     
     if not api_key or api_key.strip() == "":
         # Prima încercare: Dialog simplu
@@ -27,7 +67,7 @@ def get_api_key():
         )
         
         if api_key and api_key.strip():
-            ADDON.setSetting('api_key', api_key.strip())
+            set_setting('api_key', api_key.strip())
             
             # Confirmăm salvarea
             xbmcgui.Dialog().notification(
@@ -61,37 +101,22 @@ def get_api_key():
     
     return api_key.strip()
 
-def validate_api_key(api_key):
-    """Validează cheia API prin cerere de test la /quota (conform schemei OpenAPI)"""
-    try:
-        headers, extra_params = get_auth(api_key)
-        r = requests.get(f"{API_BASE}/quota", headers=headers, params=extra_params, timeout=5)
-        
-        if r.status_code == 200:
-            log("Cheie API validă ✓")
-            return True
-        elif r.status_code == 401:
-            log("Cheie API invalidă ✗", xbmc.LOGERROR)
-            xbmcgui.Dialog().ok(
-                "Subs.ro - Cheie API Invalidă",
-                "Cheia API introdusă nu este validă.\n\n"
-                "Te rog verifică:\n"
-                "• Cheia a fost copiată corect (fără spații)\n"
-                "• Contul de pe subs.ro este activ\n"
-                "• Cheia nu a expirat\n\n"
-                "Generează o cheie nouă de la:\n"
-                "https://subs.ro/api"
-            )
-            # Șterge cheia invalidă
-            ADDON.setSetting('api_key', '')
-            return False
-        else:
-            log(f"Eroare validare API: {r.status_code}", xbmc.LOGERROR)
-            return False
-    except Exception as e:
-        log(f"Eroare conexiune validare API: {e}", xbmc.LOGERROR)
-        # Acceptăm cheia dacă avem probleme de conexiune
-        return True
+def report_invalid_api_key():
+    """Anunță utilizatorul că cheia API e invalidă și o șterge din setări"""
+    log("Cheie API invalidă ✗", xbmc.LOGERROR)
+    xbmcgui.Dialog().ok(
+        "Subs.ro - Cheie API Invalidă",
+        "Cheia API introdusă nu este validă.\n\n"
+        "Te rog verifică:\n"
+        "• Cheia a fost copiată corect (fără spații)\n"
+        "• Contul de pe subs.ro este activ\n"
+        "• Cheia nu a expirat\n\n"
+        "Generează o cheie nouă de la:\n"
+        "https://subs.ro/api"
+    )
+    # Șterge cheia invalidă
+    set_setting('api_key', '')
+    set_setting('api_key_validated', False)
 
 def handle_api_error(status_code, response=None):
     """
@@ -129,8 +154,8 @@ def handle_api_error(status_code, response=None):
     xbmcgui.Dialog().notification("Eroare Subs.ro", msg, xbmcgui.NOTIFICATION_ERROR, 5000)
 
     if status_code == 401:
-        ADDON.setSetting('api_key', '')
-        ADDON.setSetting('api_key_validated', 'false')
+        set_setting('api_key', '')
+        set_setting('api_key_validated', False)
 
 def get_auth(api_key):
     """
@@ -139,24 +164,166 @@ def get_auth(api_key):
       - apiKey          (ApiKeyQuery)  - trimis ca query param
     Metoda se selectează din setări; implicit: header.
     """
-    auth_method = ADDON.getSetting('auth_method')  # '0' = header (default), '1' = query param
-    if auth_method == '1':
+    auth_method = get_settings().auth_method  # 0 = header (default), 1 = query param
+    if auth_method == 1:
         return {'Accept': 'application/json'}, {'apiKey': api_key}
     return {'X-Subs-Api-Key': api_key, 'Accept': 'application/json'}, {}
 
+_API_CLIENT = None
+
+def wait_for_abort(seconds):
+    """Pauză întreruptibilă; returnează True dacă Kodi cere închiderea"""
+    return xbmc.Monitor().waitForAbort(seconds)
+
+def get_api_client(api_key):
+    """
+    Returnează clientul HTTP partajat (o sesiune keep-alive per invocare).
+    Reîncercările sunt configurate din 'retry_failed_downloads' / 'retry_attempts'.
+    """
+    global _API_CLIENT
+    if _API_CLIENT is None or _API_CLIENT[0] != api_key:
+        from resources.lib import client  # requests se importă doar când e nevoie de rețea
+        cfg = get_settings()
+        headers, extra_params = get_auth(api_key)
+        retries = cfg.retry_attempts if cfg.retry_failed_downloads else 0
+        timeouts = {
+            'quota': 5,
+            'search': cfg.timeout_duration,
+            'download': 15,
+        }
+        _API_CLIENT = (api_key, client.ApiClient(headers, extra_params, timeouts=timeouts,
+                                                 retries=retries, sleep=wait_for_abort, log=log))
+    return _API_CLIENT[1]
+
+_CIRCUIT_BREAKER = None
+BREAKER_THRESHOLD = 3         # eșecuri consecutive până la deschiderea circuitului
+BREAKER_COOLDOWN = 60         # prima pauză (secunde), dublată la fiecare redeschidere
+BREAKER_MAX_COOLDOWN = 15 * 60
+
+def open_circuit_breaker():
+    """O conexiune nouă la starea circuitului (profil/breaker.db)"""
+    return breaker.CircuitBreaker(os.path.join(get_profile_path(), 'breaker.db'), threshold=BREAKER_THRESHOLD,
+                                  cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN)
+
+def get_circuit_breaker():
+    """Circuit breaker-ul API, comun tuturor invocărilor (starea e în profil)"""
+    global _CIRCUIT_BREAKER
+    if _CIRCUIT_BREAKER is None:
+        _CIRCUIT_BREAKER = open_circuit_breaker()
+    return _CIRCUIT_BREAKER
+
+def api_get(api_key, endpoint, url, circuit=None, record=True, **kwargs):
+    """
+    Cerere prin clientul partajat, contorizată în telemetrie și trecută prin
+    circuit breaker: cu circuitul deschis ridică breaker.CircuitOpen imediat.
+    Erorile de conexiune și HTTP 5xx contează ca eșecuri.
+    Pe alte fire decât cel principal: circuit=open_circuit_breaker() (conexiune
+    SQLite proprie) și record=False; telemetria se scrie apoi cu
+    record_api_request de pe firul principal.
+    """
+    circuit = circuit or get_circuit_breaker()
+    circuit.check()
+    start = time.perf_counter()
+    try:
+        r = get_api_client(api_key).get(endpoint, url, **kwargs)
+    except Exception:
+        if circuit.record_failure():
+            log("subs.ro nu răspunde: circuit deschis", xbmc.LOGWARNING)
+        raise
+    if r.status_code >= 500:
+        if circuit.record_failure():
+            log(f"subs.ro: HTTP {r.status_code}, circuit deschis", xbmc.LOGWARNING)
+    else:
+        circuit.record_success()
+    if record:
+        record_api_request(endpoint, url, r.status_code, (time.perf_counter() - start) * 1000.0)
+    return r
+
+def record_api_request(endpoint, url, status, elapsed):
+    """Contorizează o cerere API în telemetria invocării (doar de pe firul principal)"""
+    tel = get_telemetry()
+    tel.count('api_requests')
+    if log_enabled('api'):
+        tel.event('request', endpoint=endpoint, url=url, status=status, ms=round(elapsed, 1))
+        log_detail('api', f"{endpoint}: GET {url} -> {status} în {elapsed:.0f} ms")
+
+def reset_session():
+    """
+    Recitește setările și închide obiectele deschise o singură dată per
+    invocare (cache, client API, quota, depozit). Necesar doar în serviciul
+    de fundal, care rulează pe toată durata sesiunii Kodi.
+    """
+    global ADDON, _SETTINGS, _API_CLIENT, _SEARCH_CACHE, _QUOTA_TRACKER, _SUBTITLE_STORE, _SEASON_INDEX, \
+        _CIRCUIT_BREAKER, _SELECTION_HISTORY, _PREFERENCE_BOOSTS
+    ADDON = xbmcaddon.Addon()
+    _SETTINGS = _API_CLIENT = _SEARCH_CACHE = _QUOTA_TRACKER = _SUBTITLE_STORE = _SEASON_INDEX = None
+    _CIRCUIT_BREAKER = _SELECTION_HISTORY = _PREFERENCE_BOOSTS = None
+
 def get_params():
     """Extrage parametrii din URL"""
     param_string = sys.argv[2] if len(sys.argv) > 2 else ""
     return dict(urllib.parse.parse_qsl(param_string.lstrip('?')))
 
+# ============================================================================
+#                        TELEMETRIE
+# ============================================================================
+
+_TELEMETRY = None
+_PROFILER = None
+
+def get_telemetry():
+    """Înregistrarea invocării curente (creată la nevoie, ex. în benchmark-uri)"""
+    global _TELEMETRY
+    if _TELEMETRY is None:
+        _TELEMETRY = telemetry.Telemetry('direct')
+    return _TELEMETRY
+
+def start_telemetry(action):
+    """Începe înregistrarea unei invocări; 'profile_next_invocation' pornește și profilarea"""
+    global _TELEMETRY, _PROFILER
+    _TELEMETRY = telemetry.Telemetry(action)
+    if get_settings().profile_next_invocation:
+        set_setting('profile_next_invocation', False)  # o singură invocare
+        _PROFILER = telemetry.Profiler()
+        _PROFILER.start()
+    return _TELEMETRY
+
+def finish_telemetry():
+    """Adaugă înregistrarea în profil/telemetry.jsonl și salvează profilul, dacă există"""
+    global _TELEMETRY, _PROFILER
+    tel, _TELEMETRY = _TELEMETRY, None
+    profiler, _PROFILER = _PROFILER, None
+    if tel is None:
+        return
+    record = tel.finish()
+    try:
+        if profiler is not None:
+            prefix = f"{record['action']}-{time.strftime('%Y%m%d-%H%M%S')}"
+            paths = profiler.stop(os.path.join(get_profile_path(), 'profiles'), prefix)
+            record['profile'] = [os.path.basename(path) for path in paths]
+            log(f"Profil salvat: {paths[0]}")
+        if get_settings().telemetry_enabled:
+            telemetry.append_record(os.path.join(get_profile_path(), 'telemetry.jsonl'), record)
+        log(f"Durate ({record['total_ms']} ms): {record['spans']}")
+    except Exception as e:
+        log(f"Eroare telemetrie: {e}", xbmc.LOGERROR)
+
 # ============================================================================
 #                        FUNCȚII CACHE (NOU!)
 # ============================================================================
 
+_SEARCH_CACHE = None
+
+def get_profile_path():
+    """Returnează directorul de profil al addon-ului"""
+    profile_path = xbmcvfs.translatePath(ADDON.getAddonInfo('profile'))
+    if not os.path.exists(profile_path):
+        os.makedirs(profile_path)
+    return profile_path
+
 def get_cache_path():
     """Returnează path-ul pentru cache"""
-    profile_path = xbmcvfs.translatePath(ADDON.getAddonInfo('profile'))
-    cache_dir = os.path.join(profile_path, 'cache')
+    cache_dir = os.path.join(get_profile_path(), 'cache')
     if not os.path.exists(cache_dir):
         os.makedirs(cache_dir)
     return cache_dir
@@ -167,121 +334,328 @@ def get_cache_key(field, value, language='ro'):
     cache_string = f"{field}:{value}:{language}"
     return hashlib.md5(cache_string.encode()).hexdigest()
 
-def load_from_cache(cache_key):
+def get_search_cache():
+    """Deschide (o singură dată per invocare) cache-ul SQLite al căutărilor"""
+    global _SEARCH_CACHE
+    if _SEARCH_CACHE is None:
+        ttl = get_settings().cache_duration * 60  # minute -> secunde
+        max_bytes = get_settings().cache_max_size * 1024 * 1024
+        _SEARCH_CACHE = cache.SearchCache(os.path.join(get_cache_path(), 'search.db'),
+                                          ttl=ttl, max_bytes=max_bytes)
+        purge_cache_on_startup(_SEARCH_CACHE)
+    return _SEARCH_CACHE
+
+def purge_cache_on_startup(search_cache):
+    """
+    La prima invocare după pornirea Kodi: șterge intrările expirate în bloc,
+    iar dacă 'clear_cache_on_startup' e activ, golește tot cache-ul.
+    Marcajul de sesiune e o proprietate pe fereastra Home (10000).
+    """
+    home = xbmcgui.Window(10000)
+    if home.getProperty('subsro.cache_session') == 'true':
+        return
+    home.setProperty('subsro.cache_session', 'true')
+
+    try:
+        # Fișierele JSON din vechiul format de cache (câte unul per căutare)
+        for name in os.listdir(get_cache_path()):
+            if name.endswith('.json'):
+                os.remove(os.path.join(get_cache_path(), name))
+
+        if get_settings().clear_cache_on_startup:
+            search_cache.clear()
+            get_season_index().clear()
+            log("Cache golit la pornire")
+        else:
+            removed = search_cache.purge_expired()
+            log(f"Cache: {removed} intrări expirate șterse")
+            get_season_index().purge_expired()
+    except Exception as e:
+        log(f"Eroare curățare cache: {e}", xbmc.LOGERROR)
+
+def load_from_cache(field, value, language):
     """Încarcă rezultate din cache"""
-    if ADDON.getSetting('cache_results') != 'true':
-        return None
-    
-    cache_file = os.path.join(get_cache_path(), f"{cache_key}.json")
-    
-    if not os.path.exists(cache_file):
-        return None
-    
-    # Verifică dacă cache-ul e expirat
-    cache_duration = int(ADDON.getSetting('cache_duration')) * 60  # minute -> secunde
-    file_age = time.time() - os.path.getmtime(cache_file)
-    
-    if file_age > cache_duration:
-        log(f"Cache expirat pentru {cache_key}")
-        try:
-            os.remove(cache_file)
-        except:
-            pass
+    if not get_settings().cache_results:
         return None
     
+    cache_key = get_cache_key(field, value, language)
     try:
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        log(f"Cache hit pentru {cache_key}")
-        return data
-    except:
+        data = get_search_cache().get(field, value, language)
+    except Exception as e:
+        log(f"Eroare citire cache: {e}", xbmc.LOGERROR)
+        return None
+
+    if data is None:
+        get_telemetry().count('cache_miss')
+        log_detail('cache', f"Cache miss pentru {cache_key}")
         return None
+    get_telemetry().count('cache_hit')
+    log_detail('cache', f"Cache hit pentru {cache_key}")
+    return data
 
-def save_to_cache(cache_key, data):
+def save_to_cache(field, value, language, data):
     """Salvează rezultate în cache"""
-    if ADDON.getSetting('cache_results') != 'true':
+    if not get_settings().cache_results:
         return
     
-    cache_file = os.path.join(get_cache_path(), f"{cache_key}.json")
-    
+    cache_key = get_cache_key(field, value, language)
     try:
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        log(f"Salvat în cache: {cache_key}")
+        get_search_cache().put(field, value, language, data)
+        log_detail('cache', f"Salvat în cache: {cache_key}")
     except Exception as e:
         log(f"Eroare salvare cache: {e}", xbmc.LOGERROR)
 
+FLIGHT_POLL_DELAYS = (0.05, 0.1, 0.2, 0.4)   # verificări ale rezultatului altei invocări (secunde)
+
+def get_flight_timeout():
+    """Durata maximă a unei căutări (timeout × încercări + rezervă); peste ea rezervarea e abandonată"""
+    cfg = get_settings()
+    attempts = 1 + (cfg.retry_attempts if cfg.retry_failed_downloads else 0)
+    return cfg.timeout_duration * attempts + 5
+
+def claim_searches(field, value, languages):
+    """
+    Rezervă căutarea fiecărei limbi. Returnează (rezervate de această invocare,
+    în curs la altă invocare). Fără cache rezultatul nu poate fi partajat,
+    deci fiecare invocare caută singură.
+    """
+    if not get_settings().cache_results:
+        return list(languages), []
+    claimed, waiting = [], []
+    try:
+        search_cache = get_search_cache()
+        timeout = get_flight_timeout()
+        for language in languages:
+            if search_cache.claim_flight(field, value, language, timeout):
+                claimed.append(language)
+            else:
+                waiting.append(language)
+    except Exception as e:
+        log(f"Eroare coordonare căutări: {e}", xbmc.LOGERROR)
+        return list(languages), []
+    return claimed, waiting
+
+def wait_for_searches(field, value, languages):
+    """
+    Așteaptă ca altă invocare să termine căutările date și le citește din cache.
+    Returnează ({limbă: răspuns}, limbi de căutat aici): cele a căror căutare
+    s-a încheiat fără rezultat în cache sau a depășit timpul maxim.
+    """
+    search_cache = get_search_cache()
+    timeout = get_flight_timeout()
+    deadline = time.time() + timeout
+    found, pending, orphaned = {}, list(languages), []
+    attempt = 0
+    while pending:
+        for language in list(pending):
+            data = search_cache.get(field, value, language)
+            if data is not None:
+                found[language] = data
+                pending.remove(language)
+            elif not search_cache.flight_active(field, value, language, timeout):
+                # Cealaltă invocare a eșuat (răspunsurile de eroare nu intră în cache).
+                # Dacă altă invocare care aștepta preia căutarea, se așteaptă rezultatul ei.
+                if search_cache.claim_flight(field, value, language, timeout):
+                    pending.remove(language)
+                    orphaned.append(language)
+        if not pending:
+            break
+        delay = FLIGHT_POLL_DELAYS[min(attempt, len(FLIGHT_POLL_DELAYS) - 1)]
+        attempt += 1
+        if time.time() + delay > deadline or wait_for_abort(delay):
+            orphaned += pending
+            break
+    get_telemetry().count('coalesced', len(found))
+    log_detail('cache', f"Single-flight {field}={value}: {len(found)} primite, {len(orphaned)} de căutat")
+    return found, orphaned
+
+def release_searches(field, value, languages):
+    """Eliberează rezervările; rezultatele reușite sunt deja în cache"""
+    if not get_settings().cache_results:
+        return
+    try:
+        search_cache = get_search_cache()
+        for language in languages:
+            search_cache.release_flight(field, value, language)
+    except Exception as e:
+        log(f"Eroare coordonare căutări: {e}", xbmc.LOGERROR)
+
+def load_stale_from_cache(field, value, language):
+    """
+    Rezerva când subs.ro e indisponibil: rezultatele expirate încă în perioada
+    de grație, marcate 'stale' (vechimea în secunde) și per subtitrare.
+    """
+    if not get_settings().cache_results:
+        return None
+    try:
+        found = get_search_cache().get_stale(field, value, language)
+    except Exception as e:
+        log(f"Eroare citire cache: {e}", xbmc.LOGERROR)
+        return None
+    if found is None:
+        return None
+    data, age = found
+    for item in data.get('items', []):
+        item['stale'] = True
+    data['stale'] = age
+    get_telemetry().count('cache_stale')
+    log(f"API indisponibil: folosesc cache expirat ({field}={value}, {language}, vechime {age / 60:.0f} min)")
+    return data
+
 # ============================================================================
 #                        VERIFICARE QUOTA API (NOU!)
 # ============================================================================
 
-def check_quota():
+_QUOTA_TRACKER = None
+QUOTA_TTL = 15 * 60          # secunde între două interogări /quota
+QUOTA_MAX_WAIT = 5           # așteptare maximă la limitatorul de rată (secunde)
+
+def get_quota_tracker():
+    """Evidența locală a quota-ei, partajată între invocări (profil/quota.db)"""
+    global _QUOTA_TRACKER
+    if _QUOTA_TRACKER is None:
+        _QUOTA_TRACKER = quota.QuotaTracker(os.path.join(get_profile_path(), 'quota.db'), ttl=QUOTA_TTL)
+    return _QUOTA_TRACKER
+
+def refresh_quota(api_key):
     """
-    Verifică quota API via GET /quota și afișează avertisment dacă e jos.
-    Schema QuotaInfo: total_quota, used_quota, remaining_quota, quota_type, ip_address, api_key
+    GET /quota și salvează QuotaInfo în evidența locală.
+    Rulează pe un fir separat, cu propriile conexiuni SQLite. Nu modifică
+    setările și nu afișează nimic: rezultatul verificării cheii rămâne în
+    evidență și e aplicat pe firul principal (apply_key_status).
     """
-    API_KEY = get_api_key()
+    tracker = quota.QuotaTracker(os.path.join(get_profile_path(), 'quota.db'), ttl=QUOTA_TTL)
+    try:
+        # Firul poate depăși invocarea: fără telemetrie, cu conexiune proprie la breaker
+        r = api_get(api_key, 'quota', f"{API_BASE}/quota", circuit=open_circuit_breaker(), record=False)
+        if r.status_code == 200:
+            tracker.update(r.json().get('quota', {}))
+            tracker.record_key_status(api_key, 200)
+        elif r.status_code == 401:
+            log("Quota: cheie API invalidă (401)", xbmc.LOGERROR)
+            tracker.record_key_status(api_key, 401)
+        else:
+            log(f"Eroare verificare quota: {r.status_code}", xbmc.LOGERROR)
+    except Exception as e:
+        log(f"Eroare verificare quota: {e}", xbmc.LOGERROR)
+    finally:
+        tracker.release_refresh()
+
+def apply_key_status(api_key, tracker):
+    """
+    Aplică pe firul principal verificarea cheii făcută de refresh_quota:
+    cheia e marcată validă sau, la 401, utilizatorul e anunțat o singură dată.
+    """
+    status = tracker.take_key_status(api_key)
+    if status == 200 and not get_settings().api_key_validated:
+        log("Cheie API validă ✓")
+        set_setting('api_key_validated', True)
+    elif status == 401:
+        if not get_settings().api_key_validated:
+            report_invalid_api_key()
+        else:
+            handle_api_error(401)
+
+def check_quota(api_key=None):
+    """
+    Verifică quota din starea locală (schema QuotaInfo: total_quota, used_quota,
+    remaining_quota, quota_type) și afișează avertisment dacă e jos.
+    Dacă starea e mai veche de QUOTA_TTL, /quota se reîmprospătează în fundal,
+    fără a bloca căutarea.
+    """
+    API_KEY = api_key or get_api_key()
     if not API_KEY:
         return True
     
     try:
-        headers, extra_params = get_auth(API_KEY)
-        r = requests.get(f"{API_BASE}/quota", headers=headers, params=extra_params, timeout=5)
+        tracker = get_quota_tracker()
+        apply_key_status(API_KEY, tracker)
+        quota_info = tracker.snapshot()
+
+        if tracker.is_stale(quota_info) and tracker.claim_refresh():
+            threading.Thread(target=refresh_quota, args=(API_KEY,), name='subsro-quota').start()
+
+        if quota_info is None:
+            return True
+
+        total = quota_info['total_quota']
+        used = quota_info['used_quota']
+        remaining = quota_info['remaining_quota']
+        quota_type = quota_info['quota_type']
         
-        if r.status_code == 200:
-            data = r.json()
-            quota_info = data.get('quota', {})
-            
-            total = quota_info.get('total_quota', 0)
-            used = quota_info.get('used_quota', 0)
-            remaining = quota_info.get('remaining_quota', 0)
-            quota_type = quota_info.get('quota_type', 'unknown')
-            
-            log(f"Quota API ({quota_type}): {remaining}/{total} (folosit: {used})")
-            
-            # Avertisment dacă rămân sub 10%
-            if total > 0 and remaining < (total * 0.1):
+        log(f"Quota API ({quota_type}): {remaining}/{total} (folosit: {used})")
+        
+        # Avertisment dacă rămân sub 10%
+        if total > 0 and remaining < (total * 0.1):
+            if get_settings().notify_quota_warning:
                 xbmcgui.Dialog().notification(
                     "Subs.ro - Avertisment",
                     f"Quota rămasă: {remaining}/{total} cereri",
                     xbmcgui.NOTIFICATION_WARNING,
                     5000
                 )
-                return False
-            
-            return True
-        elif r.status_code == 401:
-            log("Quota: cheie API invalidă (401)", xbmc.LOGERROR)
-            handle_api_error(401, r)
             return False
+        
+        return True
     except Exception as e:
         log(f"Eroare verificare quota: {e}", xbmc.LOGERROR)
         return True
 
+def reserve_api_request(interactive=True):
+    """
+    Limitator de rată client-side, comun tuturor invocărilor.
+    Returnează False dacă quota cunoscută e epuizată sau așteptarea e prea lungă.
+    """
+    try:
+        tracker = get_quota_tracker()
+        deadline = time.time() + QUOTA_MAX_WAIT
+        while True:
+            allowed, wait = tracker.acquire()
+            if allowed:
+                return True
+            if wait is None:
+                log("Quota API epuizată (stare locală)", xbmc.LOGWARNING)
+                if interactive:
+                    xbmcgui.Dialog().notification("Subs.ro", "Quota API epuizată. Încearcă mai târziu.",
+                                                  xbmcgui.NOTIFICATION_WARNING, 5000)
+                return False
+            if time.time() + wait > deadline or wait_for_abort(wait):
+                log("Limitator de rată: prea multe cereri simultane", xbmc.LOGWARNING)
+                return False
+    except Exception as e:
+        log(f"Eroare limitator quota: {e}", xbmc.LOGERROR)
+        return True
+
+def consume_quota():
+    """Scade local quota după o căutare/descărcare reușită"""
+    try:
+        get_quota_tracker().consume()
+    except Exception as e:
+        log(f"Eroare actualizare quota: {e}", xbmc.LOGERROR)
+
 # ============================================================================
 #                    MATCHMAKING AVANSAT (NOU!)
 # ============================================================================
 
-def calculate_match_score(subtitle_name, video_file):
+def calculate_match_score(subtitle_name, video_file, ratio=None):
     """
-    Calculează un scor de potrivire între subtitrare și video
+    Calculează un scor de potrivire între subtitrare și video.
+    Acceptă nume (str) sau ReleaseInfo deja parsate pentru ambele părți;
+    'ratio' = similaritatea precalculată în lot (altfel se calculează aici).
     Returnează: (score, details)
     """
     score = 0
     details = {}
     
-    sub_lower = subtitle_name.lower()
-    video_lower = os.path.basename(video_file).lower()
+    sub = subtitle_name if isinstance(subtitle_name, release.ReleaseInfo) else release.parse_release(subtitle_name)
+    video = video_file if isinstance(video_file, release.ReleaseInfo) else release.parse_release(os.path.basename(video_file))
     
-    # 1. Detectare episod în ambele — normalizăm cu int() pentru a ignora zero-padding
+    # 1. Detectare episod în ambele — normalizat cu int() pentru a ignora zero-padding
     #    Acoperă: s05e05, s5e5, s05e5, s5e05, etc.
-    episode_pattern = r's(\d+)e(\d+)'
-    sub_match = re.search(episode_pattern, sub_lower)
-    video_match = re.search(episode_pattern, video_lower)
+    sub_ep = sub.episode_key
+    video_ep = video.episode_key
     
-    if sub_match and video_match:
-        sub_ep   = (int(sub_match.group(1)),   int(sub_match.group(2)))
-        video_ep = (int(video_match.group(1)), int(video_match.group(2)))
+    if sub_ep and video_ep:
         if sub_ep == video_ep:
             score += 100
             details['episode_match'] = True
@@ -290,104 +664,115 @@ def calculate_match_score(subtitle_name, video_file):
             details['episode_match'] = False
     
     # 2. Detectare rezoluție (2160p/4K, 1080p, 720p) — +40 dacă identică, -30 dacă diferită
-    if ADDON.getSetting('match_resolution') == 'true':
-        def detect_resolution(name):
-            """Detectează rezoluția dintr-un nume de fișier, evitând coliziuni substring."""
-            # Ordine importantă: de la mai specific la mai general
-            if re.search(r'(?<![a-z])(2160p|4320p)(?![a-z0-9])', name):
-                return '2160p'
-            if re.search(r'(?<![a-z])4k(?![a-z0-9])', name):
-                return '2160p'
-            if re.search(r'(?<![a-z])uhd(?![a-z0-9])', name):
-                return '2160p'
-            if re.search(r'(?<![a-z])(1080p|1080i|fhd)(?![a-z0-9])', name):
-                return '1080p'
-            if re.search(r'(?<![a-z])720p(?![a-z0-9])', name):
-                return '720p'
-            if re.search(r'(?<![a-z])480p(?![a-z0-9])', name):
-                return '480p'
-            return None
-
-        video_res = detect_resolution(video_lower)
-        sub_res   = detect_resolution(sub_lower)
-        
-        if video_res and sub_res:
-            if video_res == sub_res:
+    if get_settings().match_resolution:
+        if video.resolution and sub.resolution:
+            if video.resolution == sub.resolution:
                 score += 40
                 details['resolution_match'] = True
             else:
                 score -= 30
                 details['resolution_match'] = False
-        details['video_resolution'] = video_res or 'unknown'
-        details['sub_resolution']   = sub_res   or 'unknown'
+        details['video_resolution'] = video.resolution or 'unknown'
+        details['sub_resolution']   = sub.resolution   or 'unknown'
     
     # 3. Detectare sursă (BluRay, WEB-DL, HDTV)
-    sources = {
-        'bluray': ['bluray', 'bdrip', 'brrip', 'remux'],
-        'web':    ['web-dl', 'webrip', 'webdl', 'amzn', 'nf', 'netflix'],
-        'hdtv':   ['hdtv', 'pdtv']
-    }
-    
-    video_source = None
-    sub_source   = None
-    
-    for src_type, keywords in sources.items():
-        if any(k in video_lower for k in keywords):
-            video_source = src_type
-        if any(k in sub_lower for k in keywords):
-            sub_source = src_type
-    
-    if video_source and sub_source:
-        if video_source == sub_source:
+    if video.source and sub.source:
+        if video.source == sub.source:
             score += 50
             details['source_match'] = True
         else:
             score -= 20
     
     # 4. Detectare release group
-    video_group = re.search(r'-([a-z0-9]+)(?:\.[a-z0-9]+)?$', video_lower)
-    sub_group   = re.search(r'-([a-z0-9]+)(?:\.[a-z0-9]+)?$', sub_lower)
-    
-    if video_group and sub_group:
-        if video_group.group(1) == sub_group.group(1):
+    if video.group and sub.group:
+        if video.group == sub.group:
             score += 30
             details['group_match'] = True
     
-    # 5. Similaritate generală (difflib)
-    video_name = os.path.splitext(os.path.basename(video_file))[0].lower()
-    sub_name   = os.path.splitext(subtitle_name)[0].lower()
-    similarity = difflib.SequenceMatcher(None, video_name, sub_name).ratio()
-    score += int(similarity * 20)
-    details['similarity'] = similarity
+    # 5. Similaritate generală (tokeni + trigrame)
+    if ratio is None:
+        ratio = similarity.batch_similarity(video, (sub,))[0]
+    score += int(ratio * 20)
+    details['similarity'] = ratio
     
     # 6. Traducător prioritar
-    priority_translators = ['subrip', 'retail', 'netflix', 'hbo', 'amazon']
-    if any(t in sub_lower for t in priority_translators):
+    if sub.priority:
         score += 15
         details['priority_translator'] = True
     
     return score, details
 
-def sort_subtitles_by_match(items, video_file):
-    """Sortează subtitlările după scor de potrivire"""
-    scored_items = []
+def sort_subtitles_by_match(items, video_file, limit=None):
+    """
+    Sortează subtitlările după scor de potrivire.
+    Cu 'limit', doar primele 'limit' sunt păstrate (heap mărginit): scorul și
+    detaliile se atașează numai acestora, restul nu ocupă memorie suplimentară.
+    """
+    # Partea video se parsează o singură dată per căutare
+    video = release.parse_release(os.path.basename(video_file))
+    subs = [release.parse_release(item.get('title', '')) for item in items]
+    ratios = similarity.batch_similarity(video, subs)
+    boosts = get_preference_boosts()
     
-    for item in items:
-        title = item.get('title', '')
-        score, details = calculate_match_score(title, video_file)
+    def scored():
+        for index, (item, sub, ratio) in enumerate(zip(items, subs, ratios)):
+            score, details = calculate_match_score(sub, video, ratio)
+            # Căutare în mai multe limbi: limba preferată câștigă la potrivire egală
+            language_rank = item.get('language_rank', 0)
+            if language_rank:
+                score -= LANGUAGE_PENALTY * language_rank
+                details['language_rank'] = language_rank
+            # Traducătorii și grupurile alese des de utilizator urcă în clasament
+            boost = preference_boost(boosts, item.get('translator'), sub.group)
+            if boost:
+                score += boost
+                details['history_boost'] = boost
+            # -index: la scor egal rămâne ordinea API-ului (sortare stabilă)
+            yield score, -index, details, item
+    
+    # Sortare descrescătoare după scor
+    if limit is None:
+        ranked = sorted(scored(), key=lambda entry: entry[:2], reverse=True)
+    else:
+        ranked = heapq.nlargest(limit, scored(), key=lambda entry: entry[:2])
+    
+    scored_items = []
+    for score, _, details, item in ranked:
         item['match_score'] = score
         item['match_details'] = details
         scored_items.append(item)
     
-    # Sortare descrescătoare după scor
-    scored_items.sort(key=lambda x: x.get('match_score', 0), reverse=True)
-    
-    log(f"Top 3 potriviri:")
-    for i, item in enumerate(scored_items[:3]):
-        log(f"  #{i+1} (Scor: {item['match_score']:+d}): {item['title'][:60]}")
+    if log_enabled('matchmaking'):
+        log_detail('matchmaking', f"Top 3 potriviri (din {len(items)}):")
+        for i, item in enumerate(scored_items[:3]):
+            log_detail('matchmaking', f"  #{i+1} (Scor: {item['match_score']:+d}): {item['title'][:60]} {item['match_details']}")
     
     return scored_items
 
+def collapse_duplicates(items):
+    """
+    Upload-urile aproape identice (același release normalizat, același
+    traducător și aceeași limbă) devin un singur rând. Se păstrează primul
+    (ordinea API-ului / limba preferată), cu numărul de variante în 'duplicates'.
+    """
+    kept = {}
+    for item in items:
+        key = (release.parse_release(item.get('title', '')).tokens,
+               (item.get('translator') or '').strip().lower(),
+               item.get('language', ''))
+        entry = kept.get(key)
+        if entry is None:
+            kept[key] = [item, 0]
+        else:
+            entry[1] += 1
+
+    collapsed = []
+    for item, duplicates in kept.values():
+        if duplicates:
+            item['duplicates'] = duplicates
+        collapsed.append(item)
+    return collapsed
+
 # ============================================================================
 #                    FILTRARE AVANSATĂ (NOU!)
 # ============================================================================
@@ -397,14 +782,14 @@ def filter_subtitles(items, video_info):
     filtered = items[:]
     
     # Filtru: Exclude hearing impaired
-    if ADDON.getSetting('filter_by_hearing_impaired') == 'true':
+    if get_settings().filter_by_hearing_impaired:
         filtered = [item for item in filtered 
                    if 'hearing' not in item.get('title', '').lower() 
                    and 'sdh' not in item.get('title', '').lower()]
         log(f"După filtrare hearing impaired: {len(filtered)} subtitrări")
     
     # Filtru: Rating minim
-    min_rating = int(ADDON.getSetting('min_rating'))
+    min_rating = get_settings().min_rating
     if min_rating > 0:
         # Notă: API-ul nu returnează rating, dar poți adăuga logica aici
         pass
@@ -435,6 +820,8 @@ def format_label_with_badges(item, show_score=False):
         badges.append('[COLOR yellow]✓GRP[/COLOR]')
     if details.get('priority_translator'):
         badges.append('[COLOR gold]★[/COLOR]')
+    if details.get('language_rank'):
+        badges.append(f"[COLOR grey]{item.get('language', '').upper()}[/COLOR]")
     
     label = ' '.join(badges) + ' ' + title if badges else title
     
@@ -443,317 +830,1207 @@ def format_label_with_badges(item, show_score=False):
     
     return label
 
+# ============================================================================
+#                        INDEX PE SEZOANE
+# ============================================================================
+
+_SEASON_INDEX = None
+
+def get_season_index():
+    """Indexul (serial, sezon, episod) -> candidați (cache/seasons.db)"""
+    global _SEASON_INDEX
+    if _SEASON_INDEX is None:
+        _SEASON_INDEX = seasons.SeasonIndex(os.path.join(get_cache_path(), 'seasons.db'),
+                                            ttl=get_settings().cache_duration * 60)
+    return _SEASON_INDEX
+
+def get_episode_context(info, languages):
+    """(cheie serial + limbi, sezon, episod) pentru un episod de serial, altfel None"""
+    tvshow = info.getTVShowTitle()
+    season, episode = info.getSeason(), info.getEpisode()
+    if not tvshow or season < 0 or episode < 0:
+        return None
+    return f"{seasons.show_key(tvshow)}|{','.join(languages)}", season, episode
+
+def load_from_season_index(context):
+    """Răspuns de căutare sintetizat din index sau None dacă indexul nu știe sigur"""
+    if not get_settings().cache_results:
+        return None
+    try:
+        items = get_season_index().lookup(*context)
+    except Exception as e:
+        log(f"Eroare citire index sezoane: {e}", xbmc.LOGERROR)
+        return None
+    if items is None:
+        return None
+    get_telemetry().count('season_index_hit')
+    log_detail('cache', f"Index sezoane: {len(items)} candidați pentru {context}")
+    return {'status': 200, 'count': len(items), 'items': items}
+
+def index_season_results(context, data):
+    """Indexează rezultatele unei căutări de serial și returnează doar candidații episodului"""
+    if not get_settings().cache_results:
+        return data
+    try:
+        season_index = get_season_index()
+        season_index.add_items(context[0], context[1], data.get('items', []))
+        items = season_index.lookup(*context)
+    except Exception as e:
+        log(f"Eroare salvare index sezoane: {e}", xbmc.LOGERROR)
+        return data
+    if items is None:
+        return data
+    return {'status': 200, 'count': len(items), 'items': items}
+
+def save_season_pack(sub_id, members, others):
+    """
+    Pachet de sezon: membrii neactivați acum sunt decodați și salvați în depozit,
+    iar episoadele lor intră în index. Episoadele următoare nu mai descarcă arhiva.
+    """
+    try:
+        for member, content in others.items():
+            save_to_store(sub_id, members, member, decode_subtitle(content))
+        if get_settings().cache_results:
+            mapped = get_season_index().add_members(sub_id, members)
+            log(f"Pachet de sezon {sub_id}: {len(others)} subtitrări salvate, {mapped} episoade indexate")
+    except Exception as e:
+        log(f"Eroare salvare pachet de sezon: {e}", xbmc.LOGERROR)
+
+# ============================================================================
+#                        ISTORIC ALEGERI
+# ============================================================================
+
+_SELECTION_HISTORY = None
+_PREFERENCE_BOOSTS = None
+HISTORY_PICK_POINTS = 5       # puncte de scor pentru fiecare alegere anterioară
+HISTORY_MAX_BOOST = 20        # plafon per traducător / grup (sub o potrivire de sursă)
+HISTORY_PROPERTY = 'subsro.history_activated'
+
+def get_selection_history():
+    """Istoricul alegerilor (profil/history.db; nu se șterge odată cu cache-ul)"""
+    global _SELECTION_HISTORY
+    if _SELECTION_HISTORY is None:
+        _SELECTION_HISTORY = history.SelectionHistory(os.path.join(get_profile_path(), 'history.db'))
+    return _SELECTION_HISTORY
+
+def get_video_fingerprint(video_file):
+    """Amprenta fișierului redat (nume + dimensiune); None dacă dimensiunea nu se poate afla"""
+    if not video_file:
+        return None
+    try:
+        size = xbmcvfs.Stat(video_file).st_size()
+    except Exception:
+        return None
+    if not size:
+        return None
+    return history.fingerprint(os.path.basename(video_file), size)
+
+def get_preference_boosts():
+    """Contoarele de alegeri per traducător / grup, citite o dată per invocare"""
+    global _PREFERENCE_BOOSTS
+    if _PREFERENCE_BOOSTS is None:
+        _PREFERENCE_BOOSTS = {}
+        if get_settings().use_selection_history:
+            try:
+                _PREFERENCE_BOOSTS = get_selection_history().preferences()
+            except Exception as e:
+                log(f"Eroare citire istoric: {e}", xbmc.LOGWARNING)
+    return _PREFERENCE_BOOSTS
+
+def preference_boost(boosts, translator, group):
+    """Bonusul de scor din alegerile anterioare pentru traducătorul și grupul dat"""
+    if not boosts:
+        return 0
+    boost = 0
+    for kind, name in ((history.TRANSLATOR, translator), (history.GROUP, group)):
+        if name:
+            picks = boosts.get((kind, name.strip().lower()), 0)
+            boost += min(HISTORY_MAX_BOOST, picks * HISTORY_PICK_POINTS)
+    return boost
+
+def remember_selection(player, sub_id, member, choice=None):
+    """
+    Reține subtitrarea activată pentru fișierul redat. 'choice' = (traducător,
+    grup) doar pentru alegerile făcute de utilizator, care contează la bonusuri.
+    Până la redarea următoare istoricul nu mai activează nimic pentru fișier.
+    """
+    global _PREFERENCE_BOOSTS
+    if not get_settings().use_selection_history:
+        return
+    try:
+        fingerprint = get_video_fingerprint(player.getPlayingFile())
+        if fingerprint is None:
+            return
+        xbmcgui.Window(10000).setProperty(HISTORY_PROPERTY, fingerprint)
+        translator, group = choice or ('', '')
+        get_selection_history().record(fingerprint, sub_id, member, translator, group, learn=choice is not None)
+        _PREFERENCE_BOOSTS = None
+    except Exception as e:
+        log(f"Eroare salvare istoric: {e}", xbmc.LOGWARNING)
+
+def activate_from_history(video_file):
+    """
+    Fișier revăzut: activează direct subtitrarea aleasă data trecută, fără căutare.
+    După orice activare din redarea curentă (istoric sau listă) dialogul
+    redeschis afișează lista completă. Returnează True dacă subtitrarea a fost activată.
+    """
+    if not get_settings().use_selection_history:
+        return False
+    fingerprint = get_video_fingerprint(video_file)
+    if fingerprint is None:
+        return False
+    home = xbmcgui.Window(10000)
+    if home.getProperty(HISTORY_PROPERTY) == fingerprint:
+        return False
+    with get_telemetry().span('history_lookup'):
+        choice = get_selection_history().lookup(fingerprint)
+    if choice is None:
+        return False
+
+    sub_id, member = choice
+    log(f"Istoric: {os.path.basename(video_file)} -> id={sub_id} {member}")
+    home.setProperty(HISTORY_PROPERTY, fingerprint)
+    get_telemetry().count('history_hits')
+    return download_subtitle(sub_id, member=member)
+
 # ============================================================================
 #                        CĂUTARE SUBTITRĂRI
 # ============================================================================
 
+# Limbă din setări (enum: ro, en, ita, fra, ger, ung, gre, por, spa, alt)
+LANG_MAP = ('ro', 'en', 'ita', 'fra', 'ger', 'ung', 'gre', 'por', 'spa', 'alt')
+
+SEARCH_WORKERS = 3            # cereri /search simultane (câte una per limbă)
+LANGUAGE_PENALTY = 60         # scăzut din scor pentru fiecare poziție în lista de limbi
+
+def get_search_languages():
+    """
+    Limbile căutate, în ordinea preferinței: 'search_language', apoi
+    'search_language_2' și 'search_language_3' (0 = niciuna), fără duplicate.
+    """
+    cfg = get_settings()
+    indexes = [cfg.search_language]
+    indexes += [extra - 1 for extra in (cfg.search_language_2, cfg.search_language_3) if extra > 0]
+    languages = []
+    for index in indexes:
+        language = LANG_MAP[index] if 0 <= index < len(LANG_MAP) else 'ro'
+        if language not in languages:
+            languages.append(language)
+    return languages
+
+def request_search(api_key, url, language, worker=False):
+    """
+    Doar cererea de rețea: (răspuns sau excepția, conținut, durată ms).
+    Cu worker=True (fir din pool) folosește o conexiune proprie la circuit
+    breaker și nu atinge telemetria; apelantul o înregistrează după.
+    """
+    circuit = open_circuit_breaker() if worker else None
+    start = time.perf_counter()
+    try:
+        r = api_get(api_key, 'search', url, circuit=circuit, record=False, params={'language': language})
+        return r, r.content, (time.perf_counter() - start) * 1000.0
+    except Exception as e:
+        return e, None, 0.0
+    finally:
+        if circuit is not None:
+            circuit.close()
+
+def fetch_search_results(api_key, field, value, languages, interactive=True):
+    """
+    Rezultatele GET /search/{field}/{value}?language=... pentru fiecare limbă,
+    din cache sau de la API. Cererile pentru limbile lipsă din cache pleacă în
+    paralel, pe sesiunea HTTP comună; fiecare fir deschide propria conexiune la
+    circuit breaker. Cache-ul, quota, telemetria și parsarea rămân pe firul
+    principal. Fiecare limbă e salvată separat în cache.
+    O cheie căutată deja de altă invocare (ex. preîncărcarea) nu se cere din
+    nou: se așteaptă rezultatul ei în cache. Returnează {limbă: răspuns}
+    (limbile eșuate lipsesc). Cu interactive=False (preîncărcare în fundal)
+    nu se afișează notificări.
+    """
+    tel = get_telemetry()
+    results = {}
+    missing = []
+    # Verifică cache-ul
+    with tel.span('cache_lookup'):
+        for language in languages:
+            cached_data = load_from_cache(field, value, language)
+            if cached_data:
+                results[language] = cached_data
+            else:
+                missing.append(language)
+    if not missing:
+        log("Folosesc date din cache")
+        return results
+
+    # Circuit deschis: nicio cerere, direct rezultatele expirate din cache
+    state, retry_in = get_circuit_breaker().state()
+    if state == breaker.OPEN:
+        return use_stale_results(field, value, missing, results, interactive, retry_in)
+
+    # Single-flight: o cheie e căutată de o singură invocare, celelalte îi așteaptă rezultatul
+    with tel.span('single_flight'):
+        missing, waiting = claim_searches(field, value, missing)
+        if waiting:
+            found, orphaned = wait_for_searches(field, value, waiting)
+            results.update(found)
+            missing += orphaned
+    if not missing:
+        return results
+    try:
+        return request_languages(api_key, field, value, missing, results, interactive)
+    finally:
+        release_searches(field, value, missing)
+
+def request_languages(api_key, field, value, missing, results, interactive):
+    """Cererile /search pentru limbile lipsă (în paralel), completate în 'results'"""
+    tel = get_telemetry()
+
+    # Cerere API: GET /search/{searchField}/{value}?language=...
+    url = f"{API_BASE}/search/{field}/{urllib.parse.quote(str(value))}"
+
+    with tel.span('rate_limit'):
+        allowed = [language for language in missing if reserve_api_request(interactive)]
+    if not allowed:
+        return results
+
+    with tel.span('search_request'):
+        if len(allowed) == 1:
+            responses = [request_search(api_key, url, allowed[0])]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(len(allowed), SEARCH_WORKERS)) as pool:
+                responses = list(pool.map(lambda language: request_search(api_key, url, language, worker=True),
+                                          allowed))
+
+    error_shown = False
+    unavailable = []
+    for language, (r, content, elapsed) in zip(allowed, responses):
+        if content is not None:
+            record_api_request('search', url, r.status_code, elapsed)
+        if content is None:
+            log(f"Eroare căutare ({language}): {r}", xbmc.LOGERROR)
+            unavailable.append(language)
+            continue
+        tel.count('bytes_in', len(content))
+
+        if r.status_code >= 500:
+            log(f"Căutare eșuată ({language}): HTTP {r.status_code}", xbmc.LOGWARNING)
+            unavailable.append(language)
+            continue
+        if r.status_code != 200:
+            if interactive and not error_shown:
+                handle_api_error(r.status_code, r)
+                error_shown = True
+            else:
+                log(f"Căutare eșuată ({language}): HTTP {r.status_code}", xbmc.LOGWARNING)
+            continue
+
+        consume_quota()
+        if not get_settings().api_key_validated:
+            set_setting('api_key_validated', True)
+        try:
+            with tel.span('json_parse'):
+                data = json.loads(content)
+        except ValueError as e:
+            log(f"Eroare căutare ({language}): {e}", xbmc.LOGERROR)
+            continue
+        log_detail('api', f"Răspuns API ({language}): status={data.get('status')}, count={data.get('count', 0)}, requestId={data.get('meta', {}).get('requestId', '')}")
+
+        # Salvează în cache doar dacă răspunsul e valid
+        if data.get('status') == 200:
+            with tel.span('cache_save'):
+                save_to_cache(field, value, language, data)
+        results[language] = data
+
+    # Server căzut sau inaccesibil: limbile fără răspuns vin din cache-ul expirat
+    if unavailable:
+        return use_stale_results(field, value, unavailable, results, interactive)
+    return results
+
+def use_stale_results(field, value, languages, results, interactive, retry_in=None):
+    """
+    Completează 'results' cu rezultate expirate din cache pentru limbile date.
+    Dacă nu există nici rezerve, utilizatorul e anunțat că subs.ro e indisponibil.
+    """
+    with get_telemetry().span('cache_lookup'):
+        for language in languages:
+            data = load_stale_from_cache(field, value, language)
+            if data is not None:
+                results[language] = data
+    if not results and interactive:
+        wait = f", reîncerc în {retry_in / 60:.0f} min" if retry_in and retry_in >= 90 else ''
+        xbmcgui.Dialog().notification("Subs.ro", f"Serverul nu răspunde{wait}",
+                                      xbmcgui.NOTIFICATION_WARNING, 3000)
+    return results
+
+def merge_language_results(results, languages):
+    """
+    Combină răspunsurile per limbă într-unul singur, în ordinea limbilor.
+    Subtitrările duplicate (același id) sunt păstrate o singură dată, iar
+    'language_rank' (0 = limba preferată) intră în scorul de potrivire.
+    Returnează None dacă nicio limbă nu a răspuns.
+    """
+    responses = [results[language] for language in languages if language in results]
+    if not responses:
+        return None
+    valid = [data for data in responses if data.get('status') == 200]
+    if len(valid) <= 1:
+        return valid[0] if valid else responses[0]
+
+    items = []
+    seen = set()
+    for rank, language in enumerate(languages):
+        data = results.get(language)
+        if not data or data.get('status') != 200:
+            continue
+        for item in data.get('items', []):
+            if item.get('id') in seen:
+                continue
+            seen.add(item.get('id'))
+            item = dict(item)
+            item['language_rank'] = rank
+            items.append(item)
+    merged = {'status': 200, 'count': len(items), 'items': items}
+    stale = [data['stale'] for data in valid if data.get('stale')]
+    if stale:
+        merged['stale'] = max(stale)
+    return merged
+
+CONFIDENT_SIMILARITY = 0.3    # similaritate minimă titlu/fișier pentru un film găsit după nume
+
+def release_name(video_file):
+    """Numele de release al fișierului redat, dacă arată ca unul (rezoluție/sursă/grup)"""
+    if not video_file or '://' in video_file:
+        return None
+    name = os.path.splitext(os.path.basename(video_file))[0]
+    info = release.parse_release(name)
+    if info.resolution or info.source or info.group:
+        return name
+    return None
+
+def get_plan_key(info, video_file=''):
+    """Cheia sub care se ține minte câmpul de căutare: serial, imdbid sau numele fișierului"""
+    tvshow = info.getTVShowTitle()
+    if tvshow:
+        return 'show:' + seasons.show_key(tvshow)
+    imdb_id = info.getIMDBNumber()
+    if imdb_id and imdb_id.startswith('tt'):
+        return imdb_id
+    return os.path.basename(video_file).lower() or None
+
+def load_query_plan(key):
+    """Câmpul de căutare care a funcționat ultima oară pentru element"""
+    if key is None or not get_settings().cache_results:
+        return None
+    try:
+        return get_search_cache().get_plan(key)
+    except Exception as e:
+        log(f"Eroare citire plan căutare: {e}", xbmc.LOGERROR)
+        return None
+
+def save_query_plan(key, field):
+    if key is None or not get_settings().cache_results:
+        return
+    try:
+        get_search_cache().put_plan(key, field)
+    except Exception as e:
+        log(f"Eroare salvare plan căutare: {e}", xbmc.LOGERROR)
+
+def plan_queries(info, video_file='', fallback_title=''):
+    """
+    Căutările candidate conform schemei (imdbid | tmdbid | release | title), în
+    ordinea priorității. tmdbid e id-ul TMDb real (getUniqueID), nu id-ul din
+    biblioteca Kodi. Câmpul care a funcționat data trecută pentru același
+    element trece primul. Returnează o listă de (field, value).
+    """
+    queries = []
+    imdb_id = info.getIMDBNumber()
+    if imdb_id and imdb_id.startswith('tt'):
+        queries.append(("imdbid", imdb_id))
+
+    tmdb_id = str(info.getUniqueID('tmdb') or '')
+    if tmdb_id.isdigit() and int(tmdb_id) > 0:
+        queries.append(("tmdbid", tmdb_id))
+
+    name = release_name(video_file)
+    if name:
+        queries.append(("release", name))
+
+    tvshow = info.getTVShowTitle()
+    season = info.getSeason()
+    title = info.getTitle() or fallback_title
+    # Serialele se caută la nivel de sezon; episoadele sunt separate de indexul pe sezoane
+    value = f"{tvshow} S{str(season).zfill(2)}" if tvshow and season != -1 else title
+    if value:
+        queries.append(("title", value))
+
+    remembered = load_query_plan(get_plan_key(info, video_file))
+    if remembered:
+        queries.sort(key=lambda query: query[0] != remembered)
+    return queries
+
+def is_confident(items, field, info, video_file):
+    """
+    Un set de rezultate e de încredere dacă: la un episod, conține episodul
+    (S##E##) sau un pachet al sezonului; la un film, vine după id (imdb/tmdb)
+    sau măcar un titlu seamănă cu fișierul redat.
+    """
+    season, episode = info.getSeason(), info.getEpisode()
+    if info.getTVShowTitle() and season >= 0 and episode >= 0:
+        for item in items:
+            sub = release.parse_release(item.get('title', ''))
+            if sub.season == season and sub.episode in (episode, None):
+                return True
+        return False
+
+    if field in ('imdbid', 'tmdbid'):
+        return True
+    video = release.parse_release(os.path.basename(video_file) or info.getTitle())
+    subs = [release.parse_release(item.get('title', '')) for item in items]
+    return any(ratio >= CONFIDENT_SIMILARITY for ratio in similarity.batch_similarity(video, subs))
+
+def search_with_plan(api_key, info, video_file, fallback_title, languages, interactive=True):
+    """
+    Rulează căutările planificate în ordine și se oprește la primul set de
+    încredere; altfel rămâne primul set nevid. Câmpul folosit e ținut minte
+    per element. Returnează (field, răspuns); răspunsul e gol dacă niciun câmp
+    n-a găsit nimic și None la eroare API.
+    """
+    tel = get_telemetry()
+    best = empty = (None, None)
+    queries = plan_queries(info, video_file, fallback_title)
+    for field, value in queries:
+        tel.count('queries')
+        results = fetch_search_results(api_key, field, value, languages, interactive)
+        if not results:
+            break  # eroare API sau quota: celelalte câmpuri ar eșua la fel
+        data = merge_language_results(results, languages)
+        if data.get('status') != 200 or not data.get('items'):
+            log(f"Căutare {field}: niciun rezultat, încerc următorul câmp")
+            empty = (field, data)
+            continue
+        if is_confident(data['items'], field, info, video_file):
+            best = (field, data)
+            break
+        log(f"Căutare {field}: rezultate nesigure, încerc următorul câmp")
+        if best[1] is None:
+            best = (field, data)
+
+    if best[0] is None:
+        return empty
+    save_query_plan(get_plan_key(info, video_file), best[0])
+    return best
+
+ACTIVATED_PROPERTY = 'subsro.activated'
+
+def playback_mark(video_file):
+    """Identificatorul redării curente: amprenta fișierului sau, fără ea, calea"""
+    return get_video_fingerprint(video_file) or video_file or ''
+
+def mark_activated(video_file):
+    """Reține că în redarea curentă s-a activat deja o subtitrare"""
+    xbmcgui.Window(10000).setProperty(ACTIVATED_PROPERTY, playback_mark(video_file))
+
+def activated_this_playback(video_file):
+    mark = xbmcgui.Window(10000).getProperty(ACTIVATED_PROPERTY)
+    return bool(mark) and mark == playback_mark(video_file)
+
+def auto_download(items, video_file):
+    """
+    Modurile Automat / Întreabă: dacă cea mai potrivită subtitrare atinge
+    'auto_threshold', e descărcată și activată direct, fără a construi lista.
+    Dacă în redarea curentă s-a activat deja o subtitrare, dialogul redeschis
+    afișează lista (alegerea poate fi schimbată).
+    Returnează True dacă subtitrarea a fost activată; altfel se afișează lista.
+    """
+    cfg = get_settings()
+    mode = cfg.download_mode   # enum: 0 Automat | 1 Manual | 2 Întreabă
+    if mode == 1 or not items or 'match_score' not in items[0]:
+        return False
+    if activated_this_playback(video_file):
+        log("Auto-descărcare: subtitrare deja activată în această redare, afișez lista")
+        return False
+
+    best = items[0]
+    threshold = cfg.auto_threshold
+    if best['match_score'] < threshold:
+        log(f"Auto-descărcare: scor {best['match_score']} sub pragul {threshold}")
+        if cfg.notify_no_match:
+            xbmcgui.Dialog().notification("Subs.ro", "Nicio potrivire sigură, alege din listă",
+                                          xbmcgui.NOTIFICATION_INFO, 3000)
+        return False
+
+    if mode == 2:
+        question = f"{best.get('title', '')}\nScor potrivire: {best['match_score']}\n\nDescarc această subtitrare?"
+        if not xbmcgui.Dialog().yesno("Subs.ro", question):
+            return False
+
+    log(f"Auto-descărcare: id={best.get('id')} scor={best['match_score']}")
+    return download_subtitle(best.get('id'), download_link=best.get('downloadLink') or None)
+
+def load_search_results(api_key, info, video_file, languages):
+    """
+    Răspunsul de căutare pentru elementul redat: din indexul pe sezoane dacă
+    poate răspunde, altfel prin planul de căutare. None la eroare.
+    """
+    tel = get_telemetry()
+
+    # Episoadele unui sezon deja căutat se servesc din indexul pe sezoane
+    context = get_episode_context(info, languages)
+    if context is not None:
+        with tel.span('season_index'):
+            data = load_from_season_index(context)
+        if data is not None:
+            return data
+
+    field, data = search_with_plan(api_key, info, video_file, xbmc.getInfoLabel('VideoPlayer.Title'), languages)
+    if data is None:
+        return None
+    tel.set('query', field)
+    # Rezultatele expirate (API indisponibil) nu reîmprospătează indexul
+    if context is not None and data.get('status') == 200 and not data.get('stale'):
+        with tel.span('season_index'):
+            data = index_season_results(context, data)
+    return data
+
+def rank_results(items, video_file, limit):
+    """
+    Filtrează, comprimă duplicatele și păstrează primele 'limit' rezultate în
+    ordinea afișării. Returnează (rezultate, total după comprimare).
+    """
+    cfg = get_settings()
+    tel = get_telemetry()
+
+    # Aplică filtre
+    with tel.span('filter'):
+        items = filter_subtitles(items, {'video_file': video_file})
+        if cfg.collapse_duplicates:
+            total = len(items)
+            items = collapse_duplicates(items)
+            tel.count('collapsed', total - len(items))
+
+    # Sortare prin matchmaking (doar primele 'limit' sunt ordonate complet)
+    if cfg.enable_matchmaking:
+        with tel.span('sort'):
+            return sort_subtitles_by_match(items, video_file, limit), len(items)
+    return items[:limit], len(items)
+
+def build_list_item(item, cfg):
+    """ListItem-ul (etichetă cu badge-uri + detalii în plot) pentru o subtitrare"""
+    # SubtitleItem fields (schema): id(int), createdAt, updatedAt, description,
+    #   link, downloadLink, title, year(int), imdbid, tmdbid(int),
+    #   poster, translator, language, type(movie|series)
+    item_title      = item.get('title', 'Unknown Release')
+    item_year       = item.get('year', '')             # schema: integer
+    item_lang       = item.get('language', 'ro').upper()
+    item_type       = item.get('type', '')             # enum: movie | series
+    item_translator = item.get('translator', 'N/A')
+    item_poster     = item.get('poster', '')
+    item_imdbid     = item.get('imdbid', '')
+    item_tmdbid     = item.get('tmdbid', '')           # schema: integer
+    item_desc       = item.get('description', '')
+    item_link       = item.get('link', '')             # URL pagină subtitrare
+
+    if cfg.enable_matchmaking:
+        label = format_label_with_badges(item, cfg.show_match_scores)
+    else:
+        label = item_title
+    if item.get('stale'):
+        label = f"[COLOR orange]CACHE[/COLOR] {label}"
+
+    list_item = xbmcgui.ListItem(label=label, label2=label)
+    list_item.setArt({'thumb': item_poster, 'icon': 'logo.png'})
+
+    # Informații suplimentare în plot
+    plot_lines = [
+        item_title + (f" ({item_year})" if item_year else ''),
+        f"Tip: {'Film' if item_type == 'movie' else 'Serial' if item_type == 'series' else item_type}",
+        f"Traducător: {item_translator}",
+        f"Limba: {item_lang}",
+    ]
+    if item.get('duplicates'):
+        plot_lines.append(f"Variante identice: {item['duplicates']}")
+    if item.get('stale'):
+        plot_lines.append("Rezultat din cache expirat: subs.ro nu răspunde momentan")
+    if item_imdbid:
+        plot_lines.append(f"IMDb: {item_imdbid}")
+    if item_tmdbid:
+        plot_lines.append(f"TMDb: {item_tmdbid}")
+    if item_desc:
+        plot_lines.append(item_desc)
+    if item_link:
+        plot_lines.append(f"Link: {item_link}")
+
+    if 'match_score' in item:
+        plot_lines.insert(1, f"Scor potrivire: {item['match_score']}")
+
+    list_item.setInfo('video', {
+        'title': label,
+        'plot': '\n'.join(plot_lines),
+        'tagline': item_translator,
+        'year': int(item_year) if str(item_year).isdigit() else 0
+    })
+    return list_item
+
+def download_url(item):
+    """URL-ul acțiunii de download: id-ul (integer) și downloadLink-ul din schemă"""
+    cmd = f"{sys.argv[0]}?action=download&id={int(item.get('id', 0))}"
+    item_dl_link = item.get('downloadLink', '')     # URL direct download (din schemă)
+    if item_dl_link:
+        cmd += f"&dl={urllib.parse.quote(item_dl_link, safe='')}"
+    # Traducătorul și grupul alegerii, pentru istoric
+    translator, group = selection_choice(item)
+    if translator:
+        cmd += f"&tr={urllib.parse.quote(translator, safe='')}"
+    if group:
+        cmd += f"&grp={urllib.parse.quote(group, safe='')}"
+    return cmd
+
+def selection_choice(item):
+    """(traducător, grup) unei subtitrări alese de utilizator"""
+    return item.get('translator') or '', release.parse_release(item.get('title', '')).group or ''
+
+def more_results_item(remaining):
+    """Rândul final care deschide pagina următoare de rezultate"""
+    label = f"[COLOR grey]Mai multe rezultate ({remaining})…[/COLOR]"
+    return xbmcgui.ListItem(label=label, label2=label)
+
 def search_subtitles():
     """Caută subtitrări cu matchmaking și cache"""
     API_KEY = get_api_key()
     if not API_KEY:
         return
     
-    # VALIDARE API KEY la prima utilizare
-    if ADDON.getSetting('api_key_validated') != 'true':
-        log("Validare API key...")
-        if validate_api_key(API_KEY):
-            ADDON.setSetting('api_key_validated', 'true')
-        else:
-            return
-    
-    # Verifică quota periodic
-    if ADDON.getSetting('check_quota') == 'true':
-        check_quota()
+    # Validarea cheii (prima utilizare) și quota vin din starea locală;
+    # /quota se reîmprospătează în fundal doar când starea e veche.
+    # O cheie invalidă e detectată oricum de răspunsul 401 al căutării.
+    cfg = get_settings()
+    if cfg.check_quota or not cfg.api_key_validated:
+        with get_telemetry().span('check_quota'):
+            check_quota(API_KEY)
     
     handle = int(sys.argv[1])
     player = xbmc.Player()
     if not player.isPlayingVideo():
         return
 
-    info = player.getVideoInfoTag()
     video_file = player.getPlayingFile()
-    imdb_id = info.getIMDBNumber()
-    tvshow = info.getTVShowTitle()
-    season = info.getSeason()
-    episode = info.getEpisode()
-    title = info.getTitle() or xbmc.getInfoLabel('VideoPlayer.Title')
-
-    # Determină câmpul de căutare conform schemei: imdbid | tmdbid | title | release
-    tmdb_id = info.getDbId() if hasattr(info, 'getDbId') else None
-    if imdb_id and imdb_id.startswith('tt'):
-        field, value = "imdbid", imdb_id
-    elif tmdb_id and str(tmdb_id).isdigit() and int(tmdb_id) > 0:
-        field, value = "tmdbid", str(tmdb_id)
-    else:
-        field = "title"
-        value = f"{tvshow} S{str(season).zfill(2)}E{str(episode).zfill(2)}" if tvshow and season != -1 else title
-
-    # Limbă din setări (enum: ro, en, ita, fra, ger, ung, gre, por, spa, alt)
-    lang_map = {'0': 'ro', '1': 'en', '2': 'ita', '3': 'fra', '4': 'ger',
-                '5': 'ung', '6': 'gre', '7': 'por', '8': 'spa', '9': 'alt'}
-    lang_setting = ADDON.getSetting('search_language') or '0'
-    language = lang_map.get(lang_setting, 'ro')
-
-    # Verifică cache-ul
-    cache_key = get_cache_key(field, value, language)
-    cached_data = load_from_cache(cache_key)
-    
-    if cached_data:
-        log("Folosesc date din cache")
-        data = cached_data
-    else:
-        # Cerere API: GET /search/{searchField}/{value}?language=...
-        url = f"{API_BASE}/search/{field}/{urllib.parse.quote(str(value))}"
-        headers, extra_params = get_auth(API_KEY)
-        query_params = {'language': language, **extra_params}
+    tel = get_telemetry()
 
-        try:
-            r = requests.get(url, params=query_params, headers=headers,
-                             timeout=int(ADDON.getSetting('timeout_duration') or 10))
-            
-            if r.status_code != 200:
-                handle_api_error(r.status_code, r)
-                return
+    # Fișier redat deja: subtitrarea aleasă atunci, fără căutare
+    if activate_from_history(video_file):
+        xbmcplugin.endOfDirectory(handle)
+        return
 
-            data = r.json()
-            log(f"Răspuns API: status={data.get('status')}, count={data.get('count', 0)}, requestId={data.get('meta', {}).get('requestId', '')}")
-            
-            # Salvează în cache doar dacă răspunsul e valid
-            if data.get('status') == 200:
-                save_to_cache(cache_key, data)
-        
-        except Exception as e:
-            log(f"Eroare căutare: {e}", xbmc.LOGERROR)
-            xbmcplugin.endOfDirectory(handle)
-            return
+    data = load_search_results(API_KEY, player.getVideoInfoTag(), video_file, get_search_languages())
+    if data is None:
+        xbmcplugin.endOfDirectory(handle)
+        return
 
     if data.get('status') == 200:
         items = data.get('items', [])
         count = data.get('count', len(items))
         log(f"Total subtitrări găsite: {count}")
+        tel.count('results', len(items))
         
         if not items:
             xbmcgui.Dialog().notification("Subs.ro", "Nu s-au găsit subtitrări", xbmcgui.NOTIFICATION_INFO, 3000)
             xbmcplugin.endOfDirectory(handle)
             return
         
-        # Aplică filtre
-        items = filter_subtitles(items, {'video_file': video_file})
+        if data.get('stale'):
+            xbmcgui.Dialog().notification(
+                "Subs.ro", f"Server indisponibil: rezultate din cache (acum {data['stale'] / 60:.0f} min)",
+                xbmcgui.NOTIFICATION_WARNING, 4000)
         
-        # Sortare prin matchmaking
-        if ADDON.getSetting('enable_matchmaking') == 'true':
-            items = sort_subtitles_by_match(items, video_file)
+        # Doar prima pagină e ordonată și afișată; restul rămâne în spatele
+        # rândului "Mai multe rezultate"
+        page_size = cfg.results_page_size
+        items, total = rank_results(items, video_file, page_size)
         
+        # Mod automat: cea mai bună potrivire e activată direct, lista e doar rezervă.
+        # Cu rezultate din cache expirat (server indisponibil) lista se afișează mereu.
+        if not data.get('stale') and auto_download(items, video_file):
+            xbmcplugin.endOfDirectory(handle)
+            return
+
         # Afișare cu badge-uri
-        show_scores = ADDON.getSetting('show_match_scores') == 'true'
-        
-        for item in items:
-            # SubtitleItem fields (schema): id(int), createdAt, updatedAt, description,
-            #   link, downloadLink, title, year(int), imdbid, tmdbid(int),
-            #   poster, translator, language, type(movie|series)
-            item_id         = int(item.get('id', 0))          # schema: integer
-            item_title      = item.get('title', 'Unknown Release')
-            item_year       = item.get('year', '')             # schema: integer
-            item_lang       = item.get('language', 'ro').upper()
-            item_type       = item.get('type', '')             # enum: movie | series
-            item_translator = item.get('translator', 'N/A')
-            item_poster     = item.get('poster', '')
-            item_imdbid     = item.get('imdbid', '')
-            item_tmdbid     = item.get('tmdbid', '')           # schema: integer
-            item_desc       = item.get('description', '')
-            item_link       = item.get('link', '')             # URL pagină subtitrare
-            item_dl_link    = item.get('downloadLink', '')     # URL direct download (din schemă)
-
-            if ADDON.getSetting('enable_matchmaking') == 'true':
-                label = format_label_with_badges(item, show_scores)
-            else:
-                label = item_title
-            
-            list_item = xbmcgui.ListItem(label=label, label2=label)
-            list_item.setArt({'thumb': item_poster, 'icon': 'logo.png'})
-            
-            # Informații suplimentare în plot
-            plot_lines = [
-                item_title + (f" ({item_year})" if item_year else ''),
-                f"Tip: {'Film' if item_type == 'movie' else 'Serial' if item_type == 'series' else item_type}",
-                f"Traducător: {item_translator}",
-                f"Limba: {item_lang}",
-            ]
-            if item_imdbid:
-                plot_lines.append(f"IMDb: {item_imdbid}")
-            if item_tmdbid:
-                plot_lines.append(f"TMDb: {item_tmdbid}")
-            if item_desc:
-                plot_lines.append(item_desc)
-            if item_link:
-                plot_lines.append(f"Link: {item_link}")
-            
-            if 'match_score' in item:
-                plot_lines.insert(1, f"Scor potrivire: {item['match_score']}")
-            
-            list_item.setInfo('video', {
-                'title': label,
-                'plot': '\n'.join(plot_lines),
-                'tagline': item_translator,
-                'year': int(item_year) if str(item_year).isdigit() else 0
-            })
-            
-            # Pasăm id-ul (integer) și downloadLink-ul din schemă către acțiunea de download
-            cmd = f"{sys.argv[0]}?action=download&id={item_id}"
-            if item_dl_link:
-                cmd += f"&dl={urllib.parse.quote(item_dl_link, safe='')}"
-            xbmcplugin.addDirectoryItem(handle=handle, url=cmd, listitem=list_item, isFolder=False)
+        with tel.span('build_list'):
+            for item in items:
+                xbmcplugin.addDirectoryItem(handle=handle, url=download_url(item),
+                                            listitem=build_list_item(item, cfg), isFolder=False)
+            if total > len(items):
+                xbmcplugin.addDirectoryItem(handle=handle, url=f"{sys.argv[0]}?action=more&page=2",
+                                            listitem=more_results_item(total - len(items)), isFolder=False)
+        tel.count('rows', len(items))
     
     xbmcplugin.endOfDirectory(handle)
 
+def show_more_results(page):
+    """
+    Paginile următoare ale listei, într-un dialog de selecție: rezultatele vin
+    din cache / indexul pe sezoane, iar subtitrarea aleasă e descărcată direct.
+    """
+    API_KEY = get_api_key()
+    if not API_KEY:
+        return
+    player = xbmc.Player()
+    if not player.isPlayingVideo():
+        return
+
+    cfg = get_settings()
+    video_file = player.getPlayingFile()
+    data = load_search_results(API_KEY, player.getVideoInfoTag(), video_file, get_search_languages())
+    if not data or data.get('status') != 200 or not data.get('items'):
+        return
+
+    page_size = cfg.results_page_size
+    while True:
+        # Heap-ul păstrează doar rezultatele până la sfârșitul paginii cerute
+        ranked, total = rank_results(data['items'], video_file, page * page_size)
+        page_items = ranked[(page - 1) * page_size:]
+        if not page_items:
+            return
+        options = [build_list_item(item, cfg) for item in page_items]
+        remaining = total - len(ranked)
+        if remaining > 0:
+            options.append(more_results_item(remaining))
+
+        selected = xbmcgui.Dialog().select(f"Subs.ro — pagina {page}", options, useDetails=True)
+        if selected == -1:
+            return
+        if selected == len(page_items):
+            page += 1
+            continue
+        item = page_items[selected]
+        download_subtitle(item.get('id'), download_link=item.get('downloadLink') or None,
+                          choice=selection_choice(item))
+        return
+
+# ============================================================================
+#                   DEPOZIT LOCAL SUBTITRĂRI DESCĂRCATE
+# ============================================================================
+
+_SUBTITLE_STORE = None
+
+def get_subtitle_store():
+    """Depozitul persistent al subtitrărilor descărcate (cache/subtitles.db)"""
+    global _SUBTITLE_STORE
+    if _SUBTITLE_STORE is None:
+        from resources.lib import store
+        max_bytes = get_settings().store_max_size * 1024 * 1024
+        _SUBTITLE_STORE = store.SubtitleStore(os.path.join(get_cache_path(), 'subtitles.db'),
+                                              max_bytes=max_bytes)
+    return _SUBTITLE_STORE
+
+def get_stored_members(sub_id):
+    """Membrii arhivei salvați local pentru un id, sau None"""
+    try:
+        return get_subtitle_store().members(sub_id)
+    except Exception as e:
+        log(f"Eroare citire depozit subtitrări: {e}", xbmc.LOGERROR)
+        return None
+
+def load_from_store(sub_id, member):
+    """Textul salvat local pentru (id, membru); contorizează hit/miss"""
+    try:
+        subtitle_store = get_subtitle_store()
+        text = subtitle_store.get(sub_id, member) if member else None
+        subtitle_store.count('hits' if text is not None else 'misses')
+        get_telemetry().count('store_hit' if text is not None else 'store_miss')
+        if log_enabled('cache'):
+            stats = subtitle_store.stats()
+            log_detail('cache', f"Depozit subtitrări {'hit' if text is not None else 'miss'} pentru {sub_id}/{member or '-'} "
+                                f"(hits={stats['hits']}, misses={stats['misses']}, "
+                                f"{stats['entries']} fișiere, {stats['bytes'] // 1024} KB)")
+        return text
+    except Exception as e:
+        log(f"Eroare citire depozit subtitrări: {e}", xbmc.LOGERROR)
+        return None
+
+def save_to_store(sub_id, members, member, text):
+    """Salvează local textul decodat al subtitrării descărcate"""
+    try:
+        get_subtitle_store().put(sub_id, members, member, text)
+    except Exception as e:
+        log(f"Eroare salvare depozit subtitrări: {e}", xbmc.LOGERROR)
+
 # ============================================================================
 #                        DESCĂRCARE SUBTITRARE
 # ============================================================================
 
-def download_subtitle(sub_id, download_link=None):
+SUBTITLE_TEMP_DIR = "special://temp/subsro/"
+SUBTITLE_TEMP_MAX_AGE = 24 * 3600
+
+def select_archive_member(srts, player):
+    """Alege subtitrarea din arhivă conform 'multi_episode_handling'; None dacă utilizatorul anulează"""
+    if len(srts) == 1:
+        return srts[0]
+
+    multi_handling = get_settings().multi_episode_handling
+    
+    if multi_handling == 0:  # Selectare manuală
+        dialog = xbmcgui.Dialog()
+        display_names = [os.path.basename(f) for f in srts]
+        selected = dialog.select("Alege episodul:", display_names)
+        if selected == -1:
+            return None
+        return srts[selected]
+    elif multi_handling == 1:  # Prima subtitrare
+        return srts[0]
+
+    # Cea mai potrivită (matchmaking)
+    video = release.parse_release(os.path.basename(player.getPlayingFile()))
+    best_srt = srts[0]
+    best_score = -999
+    
+    members = [release.parse_release(os.path.basename(srt)) for srt in srts]
+    ratios = similarity.batch_similarity(video, members)
+    for srt, member, ratio in zip(srts, members, ratios):
+        score, _ = calculate_match_score(member, video, ratio)
+        if score > best_score:
+            best_score = score
+            best_srt = srt
+    
+    log(f"Selectat automat: {os.path.basename(best_srt)} (Scor: {best_score})")
+    return best_srt
+
+def decode_subtitle(content):
+    """
+    Conversie encoding → text Unicode, cu ș/ț normalizate la virgulă dedesubt.
+    'encoding_priority' (ISO-8859-2 / Windows-1250) decide doar la egalitate de scor.
+    """
+    from resources.lib import encoding
+    preferred = {1: 'iso-8859-2', 2: 'cp1250'}.get(get_settings().encoding_priority)
+    with get_telemetry().span('decode'):
+        text, enc = encoding.decode(content, preferred)
+    log(f"Encoding detectat: {enc}")
+    return text
+
+SUBTITLE_FPS = (None, 23.976, 24.0, 25.0, 29.97, 30.0)   # enum 'subtitle_fps'; 0 = din numele subtitrării
+
+def get_video_fps():
+    """FPS-ul videoclipului redat, raportat de player (None dacă nu e disponibil)"""
+    try:
+        return float(xbmc.getInfoLabel('Player.Process(VideoFPS)')) or None
+    except ValueError:
+        return None
+
+def get_retiming(member):
+    """
+    (raport, decalaj ms) aplicate timpilor la scriere. Raportul convertește de la
+    FPS-ul subtitrării (setare sau numele fișierului) la FPS-ul video redat.
+    """
+    from resources.lib import cues
+    cfg = get_settings()
+    ratio = 1.0
+    if cfg.filter_by_fps:
+        sub_fps = SUBTITLE_FPS[cfg.subtitle_fps] or cues.fps_from_name(os.path.basename(member))
+        video_fps = get_video_fps()
+        if sub_fps and video_fps and abs(sub_fps - video_fps) / video_fps > 0.0005:
+            ratio = sub_fps / video_fps
+            log(f"Conversie FPS {sub_fps:g} -> {video_fps:g} (raport {ratio:.5f})")
+    return ratio, cfg.subtitle_offset
+
+def write_subtitle(text, timeline, path, member):
+    """
+    Scrie subtitrarea cu timpii ajustați; fără Timeline (format netratat) textul
+    e scris nemodificat. Fișierul apare atomic (temporar + rename), deci Kodi
+    nu poate citi o subtitrare scrisă pe jumătate.
+    """
+    from resources.lib import cues
+    temp_path = path + '.part'
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            if timeline is None:
+                f.write(text)
+            else:
+                ratio, offset = get_retiming(member)
+                cues.write(timeline, f, ratio, offset)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def get_subtitle_output_path(sub_id, member):
+    """
+    Path unic per descărcare în special://temp/subsro/, ca descărcările
+    concurente să nu-și suprascrie fișierele. Fișierele vechi se șterg.
+    """
+    import uuid
+    from resources.lib import archive
+    out_dir = xbmcvfs.translatePath(SUBTITLE_TEMP_DIR)
+    if not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+    else:
+        cutoff = time.time() - SUBTITLE_TEMP_MAX_AGE
+        for name in os.listdir(out_dir):
+            path = os.path.join(out_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    ext = os.path.splitext(member)[1].lower()
+    if ext not in archive.SUBTITLE_EXTENSIONS:
+        ext = '.srt'
+    return os.path.join(out_dir, f"forced.romanian.subsro.{sub_id}.{uuid.uuid4().hex[:8]}{ext}")
+
+ACTIVATION_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8)   # backoff adaptiv (secunde)
+ACTIVATION_TIMEOUT = 6.5
+
+def is_own_stream(name):
+    """Numele fluxului extern adăugat de addon (forced.romanian...) sau 'External'"""
+    name = name.lower()
+    return "forced.romanian" in name or "external" in name
+
+def activate_subtitle(player, path):
+    """
+    Încarcă subtitrarea și selectează fluxul extern imediat ce Kodi îl înregistrează
+    (numărul de fluxuri crește). Verificările urmează un backoff adaptiv (50 ms,
+    dublat până la 800 ms), iar fluxul e selectat o singură dată. Returnează durata activării în secunde
+    sau None dacă fluxul nu a apărut în ACTIVATION_TIMEOUT.
+    """
+    start = time.time()
+    known = len(player.getAvailableSubtitleStreams())
+    player.setSubtitles(path)
+
+    attempt = 0
+    while player.isPlayingVideo():
+        streams = player.getAvailableSubtitleStreams()
+        if len(streams) > known:
+            # Doar fluxurile apărute după setSubtitles; cel numit de addon are prioritate
+            added = range(len(streams) - 1, known - 1, -1)
+            index = next((i for i in added if is_own_stream(streams[i])), len(streams) - 1)
+            if player.getSubtitleStream() != index:
+                player.setSubtitleStream(index)
+            player.showSubtitles(True)
+            elapsed = time.time() - start
+            log(f"Subtitrare activată în {elapsed * 1000:.0f} ms (flux {index})")
+            return elapsed
+
+        if time.time() - start >= ACTIVATION_TIMEOUT:
+            break
+        delay = ACTIVATION_DELAYS[min(attempt, len(ACTIVATION_DELAYS) - 1)]
+        attempt += 1
+        if wait_for_abort(delay):
+            break
+
+    log(f"Fluxul de subtitrare nu a apărut după {(time.time() - start) * 1000:.0f} ms", xbmc.LOGWARNING)
+    return None
+
+def read_vfs_file(url):
+    """Conținutul unui fișier din VFS-ul Kodi (inclusiv membri archive:// / rar://)"""
+    f = xbmcvfs.File(url)
+    try:
+        return bytes(f.readBytes())
+    finally:
+        f.close()
+
+
+def get_vfs_access():
+    """Accesul la VFS pentru arhivele RAR/7z: listare și citire fără extragere"""
+    from resources.lib import archive
+    return archive.VfsAccess(xbmcvfs.listdir, read_vfs_file, xbmcvfs.translatePath(SUBTITLE_TEMP_DIR))
+
+
+def fetch_subtitle(api_key, url, sub_id, player, member=None):
+    """
+    Descarcă arhiva în streaming și extrage subtitrarea aleasă.
+    Returnează (membri, membru ales, text, {alt membru: octeți}) sau None.
+    """
+    from resources.lib import archive
+    tel = get_telemetry()
+    with tel.span('rate_limit'):
+        if not reserve_api_request():
+            return None
+
+    # Endpoint-ul returnează binar (application/octet-stream), nu JSON
+    with tel.span('download_request'):
+        r = api_get(api_key, 'download', url, headers={'Accept': None}, stream=True)
+        try:
+            if r.status_code != 200:
+                handle_api_error(r.status_code, r)
+                return None
+
+            consume_quota()
+            payload = archive.read_stream(r.iter_content(archive.CHUNK_SIZE))
+        finally:
+            r.close()
+    tel.count('bytes_in', payload.seek(0, os.SEEK_END))
+    payload.seek(0)
+
+    with payload, archive.open_payload(payload, name=f"subsro.{sub_id}", vfs=get_vfs_access()) as z:
+        srts = z.members()
+        if not srts:
+            return None
+        
+        # Gestionare episoade multiple
+        f_name = member if member in srts else select_archive_member(srts, player)
+        if f_name is None:
+            return None
+
+        text = decode_subtitle(z.read(f_name))
+
+        # Pachet de sezon: celelalte episoade ale aceluiași sezon se salvează după
+        # activare. Un membru care nu poate fi citit e doar sărit.
+        others = {}
+        for name in season_pack_siblings(srts, f_name):
+            try:
+                others[name] = z.read(name)
+            except Exception as e:
+                log(f"Pachet de sezon: {name} ignorat ({e})", xbmc.LOGWARNING)
+        return srts, f_name, text, others
+
+def season_pack_siblings(members, chosen):
+    """
+    Membrii care sunt alte episoade din sezonul membrului ales; pentru arhivele
+    obișnuite (CD1/CD2, variante de FPS) lista e goală și nu se citește nimic.
+    """
+    info = release.parse_release(os.path.basename(chosen))
+    if info.season is None or info.episode is None:
+        return []
+    siblings = []
+    for name in members:
+        other = release.parse_release(os.path.basename(name))
+        if name != chosen and other.season == info.season and other.episode not in (None, info.episode):
+            siblings.append(name)
+    return siblings
+
+def download_subtitle(sub_id, download_link=None, member=None, choice=None):
     """
     Descarcă și activează subtitrarea.
     Endpoint primar:  GET /subtitle/{id}/download → application/octet-stream
     Fallback:         downloadLink din SubtitleItem dacă e furnizat de API
     Schema: {id} este integer.
+    Răspunsul e citit în streaming într-un buffer limitat, fără fișiere temporare.
+    'member' = membrul arhivei deja ales (istoric); 'choice' = (traducător, grup)
+    pentru alegerile utilizatorului. Returnează True dacă subtitrarea a fost activată.
     """
+    from resources.lib import archive, cues  # doar descărcarea are nevoie de gzip/tempfile
     API_KEY = get_api_key()
     if not API_KEY:
-        return
+        return False
     
     # id trebuie să fie integer conform schemei
     try:
         sub_id_int = int(sub_id)
     except (TypeError, ValueError):
         log(f"ID subtitrare invalid: {sub_id}", xbmc.LOGERROR)
-        return
-
-    headers, extra_params = get_auth(API_KEY)
-    # Endpoint-ul returnează binar (application/octet-stream), nu JSON
-    headers.pop('Accept', None)
+        return False
 
     # Folosim downloadLink din SubtitleItem dacă e disponibil,
     # altfel construim URL-ul standard: GET /subtitle/{id}/download
     if download_link:
         url = download_link
-        log(f"Download via downloadLink din SubtitleItem: {url}")
+        log_detail('api', f"Download via downloadLink din SubtitleItem: {url}")
     else:
         url = f"{API_BASE}/subtitle/{sub_id_int}/download"
-        log(f"Download via endpoint standard: {url}")
+        log_detail('api', f"Download via endpoint standard: {url}")
     
     player = xbmc.Player()
-    tmp_path = xbmcvfs.translatePath("special://temp/")
-    archive = os.path.join(tmp_path, "subs_download.zip")
-    target_srt = os.path.join(tmp_path, "forced.romanian.subsro.srt")
+    tel = get_telemetry()
 
     try:
-        r = requests.get(url, headers=headers, params=extra_params, timeout=15)
-        
-        if r.status_code != 200:
-            handle_api_error(r.status_code, r)
-            return
-            
-        with open(archive, "wb") as f:
-            f.write(r.content)
-        
-        with zipfile.ZipFile(archive, 'r') as z:
-            srts = sorted([f for f in z.namelist() if f.lower().endswith(('.srt', '.ass'))])
-            if not srts:
-                return
-            
-            # Gestionare episoade multiple
-            multi_handling = ADDON.getSetting('multi_episode_handling')
-            
-            if len(srts) > 1:
-                if multi_handling == '0':  # Selectare manuală
-                    dialog = xbmcgui.Dialog()
-                    display_names = [os.path.basename(f) for f in srts]
-                    selected = dialog.select("Alege episodul:", display_names)
-                    if selected == -1:
-                        return
-                    f_name = srts[selected]
-                elif multi_handling == '1':  # Prima subtitrare
-                    f_name = srts[0]
-                else:  # Cea mai potrivită (matchmaking)
-                    video_file = player.getPlayingFile()
-                    best_srt = srts[0]
-                    best_score = -999
-                    
-                    for srt in srts:
-                        score, _ = calculate_match_score(os.path.basename(srt), video_file)
-                        if score > best_score:
-                            best_score = score
-                            best_srt = srt
-                    
-                    f_name = best_srt
-                    log(f"Selectat automat: {os.path.basename(f_name)} (Scor: {best_score})")
-            else:
-                f_name = srts[0]
-            
-            # Conversie encoding
-            content = z.read(f_name)
-            encoding_priority = int(ADDON.getSetting('encoding_priority'))
-            
-            encodings = ['utf-8', 'iso-8859-2', 'windows-1250', 'latin1']
-            if encoding_priority > 0:
-                # Rotește lista conform priorității
-                encodings = encodings[encoding_priority:] + encodings[:encoding_priority]
-            
-            text = None
-            for enc in encodings:
-                try:
-                    text = content.decode(enc)
-                    log(f"Encoding detectat: {enc}")
-                    break
-                except:
-                    continue
-            
-            if not text:
-                text = content.decode('latin1', errors='ignore')
-            
-            with open(target_srt, "w", encoding="utf-8") as f:
-                f.write(text)
+        # Depozitul local: aceeași subtitrare activată din nou nu mai costă rețea sau quota
+        f_name = text = None
+        others = {}
+        with tel.span('store_lookup'):
+            stored_members = get_stored_members(sub_id_int)
+        if stored_members:
+            f_name = member if member in stored_members else select_archive_member(stored_members, player)
+            if f_name is None:
+                return False
+        with tel.span('store_lookup'):
+            text = load_from_store(sub_id_int, f_name)
+
+        fetched = text is None
+        if fetched:
+            result = fetch_subtitle(API_KEY, url, sub_id_int, player, f_name or member)
+            if result is None:
+                return False
+            srts, f_name, text, others = result
+
+        # Structura replicilor e validată înainte de salvare și activare
+        with tel.span('parse'):
+            fmt = cues.detect_format(f_name, text)
+            timeline = cues.parse(text, fmt) if fmt else None
+        if timeline is not None:
+            tel.count('cues', len(timeline))
+
+        if fetched:
+            with tel.span('store_save'):
+                save_to_store(sub_id_int, srts, f_name, text)
+
+        with tel.span('write_file'):
+            target_srt = get_subtitle_output_path(sub_id_int, f_name)
+            write_subtitle(text, timeline, target_srt, f_name)
 
         xbmc.executebuiltin("Dialog.Close(subtitlesearch)")
-        xbmc.sleep(500)
-        player.setSubtitles(target_srt)
-        
-        # Activare forțată
-        for _ in range(15):
-            if not player.isPlayingVideo():
-                break
-            streams = player.getAvailableSubtitleStreams()
-            for i, s_name in enumerate(streams):
-                if "forced.romanian" in s_name.lower() or "external" in s_name.lower():
-                    if player.getSubtitleStream() != i:
-                        player.setSubtitleStream(i)
-                        player.showSubtitles(True)
-            xbmc.sleep(400)
+        with tel.span('activation'):
+            activate_subtitle(player, target_srt)
+        mark_activated(player.getPlayingFile())
+        remember_selection(player, sub_id_int, f_name, choice)
+
+        if others:
+            with tel.span('season_pack'):
+                save_season_pack(sub_id_int, srts, others)
 
         # Notificare
-        if ADDON.getSetting('notify_auto_download') == 'true':
-            duration = int(ADDON.getSetting('notify_duration')) * 1000
+        if get_settings().notify_auto_download:
+            duration = get_settings().notify_duration * 1000
             xbmcgui.Dialog().notification(
                 "Subs.ro",
                 "Activat: " + os.path.basename(f_name)[:30],
                 xbmcgui.NOTIFICATION_INFO,
                 duration
             )
+        return True
 
+    except archive.PayloadTooLarge as e:
+        log(f"Subtitrare prea mare: {e}", xbmc.LOGERROR)
+        xbmcgui.Dialog().notification("Subs.ro", "Fișier prea mare", xbmcgui.NOTIFICATION_ERROR, 3000)
+    except breaker.CircuitOpen as e:
+        log(f"Descărcare amânată: {e}", xbmc.LOGWARNING)
+        xbmcgui.Dialog().notification("Subs.ro", "Serverul nu răspunde, încearcă mai târziu",
+                                      xbmcgui.NOTIFICATION_WARNING, 3000)
+    except cues.InvalidSubtitle as e:
+        log(f"Subtitrare invalidă ({f_name}): {e}", xbmc.LOGERROR)
+        xbmcgui.Dialog().notification("Subs.ro", "Subtitrare invalidă, alege alta", xbmcgui.NOTIFICATION_ERROR, 3000)
+    except archive.VfsUnavailable as e:
+        log(f"Arhivă nesuportată de VFS: {e}", xbmc.LOGERROR)
+        xbmcgui.Dialog().notification("Subs.ro", "Arhivă RAR/7z: instalează vfs.libarchive",
+                                      xbmcgui.NOTIFICATION_ERROR, 4000)
+    except archive.UnsupportedPayload as e:
+        log(f"Format descărcare nesuportat: {e}", xbmc.LOGERROR)
+        xbmcgui.Dialog().notification("Subs.ro", "Format de arhivă nesuportat", xbmcgui.NOTIFICATION_ERROR, 3000)
     except Exception as e:
         log(f"Eroare download: {e}", xbmc.LOGERROR)
         xbmcgui.Dialog().notification("Subs.ro", "Eroare la descărcare", xbmcgui.NOTIFICATION_ERROR, 3000)
+    return False
 
 # ============================================================================
 #                            ENTRY POINT
 # ============================================================================
 
 if __name__ == '__main__':
+    load_settings()
     p = get_params()
-    if p.get('action') == 'download':
-        # 'dl' = downloadLink din SubtitleItem (opțional, URL direct din schemă)
-        dl_encoded = p.get('dl', '')
-        dl_url = urllib.parse.unquote(dl_encoded) if dl_encoded else None
-        download_subtitle(p.get('id'), download_link=dl_url)
-    else:
-        search_subtitles()
+    start_telemetry(p.get('action') or 'search')
+    try:
+        if p.get('action') == 'download':
+            # 'dl' = downloadLink din SubtitleItem (opțional, URL direct din schemă)
+            dl_encoded = p.get('dl', '')
+            dl_url = urllib.parse.unquote(dl_encoded) if dl_encoded else None
+            # Alegere din listă: contează pentru preferințele din istoric
+            download_subtitle(p.get('id'), download_link=dl_url, choice=(p.get('tr', ''), p.get('grp', '')))
+        elif p.get('action') == 'more':
+            show_more_results(int(p.get('page', 2)))
+        else:
+            search_subtitles()
+    finally:
+        finish_telemetry()